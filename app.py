@@ -1,24 +1,108 @@
 # Import necessary libraries
 import streamlit as st  # Streamlit for building web UI
-import re  # Regular expressions for string operations
 import pandas as pd  # Data manipulation and analysis
 import altair as alt  # Data visualization library
 
 # Import backend helper functions
 from backend import (
-    extract_text,  # Function to extract raw text from uploaded resume
-    ats_keyword_check,  # Check ATS keyword match between resume and job description
-    optimize_resume,  # Optimize resume using LLM
-    export_to_docx,  # Export content to DOCX format
-    export_to_pdf,  # Export content to PDF format
-    fetch_dynamic_skillset_from_perplexity,  # Get dynamic skillset from job description
-    parse_sections_with_llm,  # Parse resume into sections using LLM
+    export_document,  # Export content to DOCX/PDF bytes (memoized)
+    get_jd_profile,  # Stored job description profiles (skillset, keywords)
+    saved_roles,  # Role names with a saved job description
     regenerate_section_with_llm,  # Regenerate a specific resume section
-    score_all_sections  # Score each resume section
+    run_analysis_pipeline,  # Run extraction, ATS check, optimization, parsing and scoring in parallel
+    split_sections,  # Split a structured resume into (section, content) pairs
+    IncrementalScorer,  # Re-score edited sections in the background
+    SectionPrefetcher,  # Regenerate low-scoring sections ahead of a Regenerate click
+    PREFETCH_REGENERATION  # Default for the prefetch toggle
 )
 
+import metrics  # Stage timings and LLM call instrumentation
+from service import ServiceClient  # Client for the headless analysis service
+import os  # Environment configuration
+import time  # Polling interval for remote analysis jobs
+
 from copy import deepcopy  # For deep copying Python objects
 
+# MIME types for downloadable documents
+EXPORT_MIME_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+
+def lazy_download_button(label, text, fmt, file_name):
+    """
+    Show a download button whose document is only rendered once the user asks for it.
+    Rendering is memoized by content, so reruns with unchanged text cost nothing.
+    """
+    ready_key = f"export_ready_{file_name}"
+    if st.session_state.get(ready_key) or st.button(f"📄 Prepare {fmt.upper()}: {file_name}", key=f"prepare_{file_name}"):
+        st.session_state[ready_key] = True
+        st.download_button(label, export_document(text, fmt), file_name, EXPORT_MIME_TYPES[fmt], key=f"download_{file_name}")
+
+
+@st.fragment(run_every=1.0)
+def watch_rescoring():
+    """
+    Poll background re-scoring of edited sections and rerun the app once new scores are ready,
+    so the score labels and chart update in place.
+    """
+    rescorer = st.session_state.get("rescorer")
+    if rescorer is not None and rescorer.has_pending() and rescorer.tick():
+        st.rerun()
+
+
+# Optional headless analysis service; when set, this app only submits jobs and shows their results
+SERVICE_URL = os.getenv("RESUME_REFINER_SERVICE_URL")
+
+# Progress messages shown as each pipeline stage finishes
+STAGE_LABELS = {
+    "resume_text": "🔍 Extracted resume text",
+    "skillset": "🎯 Extracted relevant skillset from JD",
+    "ats": "⚙️ Ran ATS keyword check",
+    "optimize": "🧠 Optimized resume via LLM",
+    "structured_resume": "🧾 Parsed sections from resume",
+    "section_scores": "📊 Scored each resume section",
+}
+
+
+def wait_for_remote_job(client, job_id, report_stage):
+    """
+    Poll an analysis job on the service until it finishes, reporting stages as they complete.
+    Returns the analysis result, or None if the job failed or is unknown.
+    """
+    reported = set()
+    while True:
+        job = client.get(job_id)
+        if job is None:
+            st.warning("The analysis job is no longer available. Please run the analysis again.")
+            return None
+        for stage in job["stages"]:
+            if stage not in reported:
+                reported.add(stage)
+                report_stage(stage, len(reported), len(STAGE_LABELS))
+        if job["status"] == "done":
+            return job["result"]
+        if job["status"] == "failed":
+            st.error(f"Analysis failed: {job['error']}")
+            return None
+        time.sleep(0.5)
+
+
+def store_analysis(result, prefetcher=None):
+    """
+    Keep an analysis result in session state, start tracking section edits for re-scoring
+    and, when enabled, prefetch rewrites of low-scoring sections.
+    """
+    sections = dict(split_sections(result["structured_resume"]))
+    st.session_state.resume_data = result
+    st.session_state.rescorer = IncrementalScorer()
+    st.session_state.rescorer.baseline(sections)
+    st.session_state.prefetcher = prefetcher or SectionPrefetcher()
+    if st.session_state.get("prefetch_enabled"):
+        st.session_state.prefetcher.prefetch(sections, result["section_scores"])
+
+
 # Set Streamlit page configuration
 st.set_page_config(page_title="AI Resume Optimizer", layout="wide")
 
@@ -32,6 +116,25 @@ resume_file = st.file_uploader("📤 Upload Your Resume (.pdf or .docx)", type=[
 # Text area for pasting job description
 job_desc = st.text_area("📌 Paste the Job Description", height=200)
 
+# Optional role name: saves the job description's profile, or reuses a saved one when the box above is empty
+role_name = st.text_input(
+    "🏷️ Role name (optional)",
+    help="Name this job description to reuse it later without pasting it again. "
+         f"Saved roles: {', '.join(saved_roles()) or 'none yet'}"
+)
+if not job_desc.strip() and role_name.strip():
+    try:
+        job_desc = get_jd_profile(role=role_name).job_desc
+        st.caption(f"Using the saved job description for '{role_name.strip()}'.")
+    except KeyError:
+        pass
+
+# Opt-in: regenerate low-scoring sections in the background so Regenerate returns instantly
+prefetch_enabled = st.sidebar.checkbox(
+    "⚡ Prefetch rewrites for low-scoring sections", value=PREFETCH_REGENERATION, key="prefetch_enabled",
+    help="Uses extra API calls: sections scoring below the threshold are rewritten ahead of time."
+)
+
 # Initialize session state to store resume data
 if "resume_data" not in st.session_state:
     st.session_state.resume_data = {}
@@ -44,40 +147,57 @@ if st.button("🔍 Analyze & Optimize"):
     elif not job_desc.strip():
         st.warning("Please paste the job description.")
     else:
-        # Extract text from uploaded resume
-        with st.spinner("🔍 Extracting resume text..."):
-            resume_text = extract_text(resume_file)
-
-        # Extract dynamic skillset from job description
-        with st.spinner("🎯 Extracting relevant skillset from JD..."):
-            dynamic_skillset = fetch_dynamic_skillset_from_perplexity(job_desc)
-
-        # Run ATS keyword check
-        with st.spinner("⚙️ Running ATS keyword check..."):
-            ats = ats_keyword_check(resume_text, job_desc)
-
-        # Optimize resume using LLM
-        with st.spinner("🧠 Optimizing resume via LLM..."):
-            optimized_resume, resume_skills, jd_skills = optimize_resume(resume_text, job_desc, dynamic_skillset)
-
-        # Parse structured resume sections
-        with st.spinner("🧾 Parsing sections from resume..."):
-            structured_resume = parse_sections_with_llm(resume_text)
-
-        # Score each resume section
-        with st.spinner("📊 Scoring each resume section..."):
-            section_scores = score_all_sections(structured_resume)
-
-        # Store all outputs in session state
-        st.session_state.resume_data = {
-            "resume_text": resume_text,
-            "ats": ats,
-            "optimized_resume": optimized_resume,
-            "resume_skills": resume_skills,
-            "jd_skills": jd_skills,
-            "structured_resume": structured_resume,
-            "section_scores": section_scores
-        }
+        progress = st.progress(0.0, text="🚀 Running analysis...")
+
+        def report_stage(stage, done, total):
+            progress.progress(done / total, text=f"{STAGE_LABELS.get(stage, stage)} ({done}/{total})")
+
+        if SERVICE_URL:
+            # Submit to the analysis service; the job id in the URL lets a refreshed page reattach
+            client = ServiceClient(SERVICE_URL)
+            job_id = client.submit(resume_file.name, resume_file.getvalue(), job_desc)
+            st.query_params["job"] = job_id
+            result = wait_for_remote_job(client, job_id, report_stage)
+        else:
+            # Live preview of the optimized resume while it streams in
+            live_preview = st.expander("🧠 Optimizing resume (live)", expanded=True).empty()
+            streamed_parts = []
+
+            def show_optimize_delta(delta):
+                streamed_parts.append(delta)
+                live_preview.markdown("".join(streamed_parts))
+
+            # Start prefetching rewrites as soon as section scores arrive, while other stages still run
+            prefetcher = SectionPrefetcher()
+            parsed_sections = {}
+
+            def prefetch_low_scores(stage, stage_result):
+                if stage == "structured_resume":
+                    parsed_sections.update(split_sections(stage_result))
+                elif stage == "section_scores" and prefetch_enabled:
+                    prefetcher.prefetch(parsed_sections, stage_result)
+
+            # Run all analysis stages, independent ones in parallel
+            result = run_analysis_pipeline(
+                resume_file, job_desc, on_stage_complete=report_stage, on_optimize_delta=show_optimize_delta,
+                on_stage_result=prefetch_low_scores, role=role_name.strip() or None
+            )
+        progress.empty()
+
+        # Store outputs in session state and track section contents so later edits are re-scored incrementally
+        if result:
+            store_analysis(result, None if SERVICE_URL else prefetcher)
+
+# Reattach to a remote analysis after a page refresh or reconnect
+elif SERVICE_URL and not st.session_state.resume_data and st.query_params.get("job"):
+    progress = st.progress(0.0, text="🔄 Reconnecting to analysis...")
+    result = wait_for_remote_job(
+        ServiceClient(SERVICE_URL), st.query_params["job"],
+        lambda stage, done, total: progress.progress(done / total, text=f"{STAGE_LABELS.get(stage, stage)} ({done}/{total})")
+    )
+    progress.empty()
+    if result:
+        store_analysis(result)
 
 # Display results if resume data exists
 if st.session_state.resume_data:
@@ -96,6 +216,13 @@ if st.session_state.resume_data:
     st.write(f"**From Resume:** {', '.join(sorted(data['resume_skills']))}")
     st.write(f"**From JD:** {', '.join(sorted(data['jd_skills']))}")
 
+    # AI-optimized resume with streaming latency
+    with st.expander("🧠 AI-Optimized Resume"):
+        st.markdown(data['optimized_resume'])
+        ttft = data.get('optimize_stats', {}).get('time_to_first_token')
+        if ttft is not None:
+            st.caption(f"⚡ First token after {ttft:.2f}s")
+
     # Option to show raw resume text
     show_raw = st.checkbox("📄 Show Raw Resume Text")
     if show_raw:
@@ -109,66 +236,106 @@ if st.session_state.resume_data:
     if "current_sections" not in st.session_state:
         st.session_state.current_sections = {}
 
+    # Merge scores of edited sections that finished re-scoring in the background
+    rescorer = st.session_state.get("rescorer")
+    if rescorer is not None:
+        data["section_scores"].update(rescorer.poll())
+    prefetcher = st.session_state.get("prefetcher")
+
     # Split parsed resume into sections
-    sections = data["structured_resume"].split("=== ")
-    for sec in sections:
-        if sec.strip():
-            header, *content = sec.strip().split("\n", 1)
-            header = re.sub(r"^=+\s*|\s*=+$", "", header).strip()
-            content_text = content[0].strip() if content else ""
-
-            original_sections[header] = content_text
-            if header not in st.session_state.current_sections:
-                st.session_state.current_sections[header] = content_text
-
-            # Layout: Text area and buttons side-by-side
-            col_text, col_btns = st.columns([6, 2])
-
-            # Editable text area for section content
-            with col_text:
-                st.session_state.current_sections[header] = st.text_area(
-                    f"✏️ {header}",
-                    value=st.session_state.current_sections[header],
-                    height=150,
-                    key=f"edit_{header}"
-                )
-
-                # Display score for section
-                score_text = data["section_scores"].get(header, "")
-                if score_text:
-                    match = re.search(r"Score:\s*\*{0,2}(\d+/10)\*{0,2}", score_text)
-                    if match:
-                        st.markdown(f"**Score:** {match.group(1)}")
-
-            # Regenerate and reset buttons
-            with col_btns:
-                st.markdown("<div style='height: 110px;'></div>", unsafe_allow_html=True)  # Button alignment
-                b1, b2 = st.columns([1, 1])
-
-                with b1:
-                    if st.button(f"🔄 Regenerate", key=f"regen_{header}", help="Regenerate"):
-                        with st.spinner(f"Regenerating '{header}'..."):
-                            regenerated = regenerate_section_with_llm(header, st.session_state.current_sections[header])
-                            st.session_state.current_sections[header] = regenerated
-
-                with b2:
-                    if st.button(f"♻️ Reset", key=f"reset_{header}", help="Reset"):
-                        st.session_state.current_sections[header] = original_sections[header]
-                        
-            # # Full feedback in an expander
-            # full_score_text = data["section_scores"].get(header, "").strip()
-            # if full_score_text:
-            #     with st.expander(f"📊 Score & Feedback for '{header}'", expanded=True):
-            #         st.markdown(full_score_text)
+    for header, content_text in split_sections(data["structured_resume"]):
+        original_sections[header] = content_text
+        if header not in st.session_state.current_sections:
+            st.session_state.current_sections[header] = content_text
+
+        # Layout: Text area and buttons side-by-side
+        col_text, col_btns = st.columns([6, 2])
+
+        # Editable text area for section content
+        with col_text:
+            st.session_state.current_sections[header] = st.text_area(
+                f"✏️ {header}",
+                value=st.session_state.current_sections[header],
+                height=150,
+                key=f"edit_{header}"
+            )
+
+            # Display score for section
+            section_score = data["section_scores"].get(header, {}).get("score")
+            if section_score is not None:
+                st.markdown(f"**Score:** {section_score}/10")
+            if rescorer is not None and rescorer.is_pending(header):
+                st.caption("⏳ Re-scoring after edit...")
+            elif prefetcher is not None and prefetcher.is_ready(header, st.session_state.current_sections[header]):
+                st.caption("⚡ Rewrite ready")
+
+            # Placeholder for streaming a regenerated section
+            regen_preview = st.empty()
+
+        # Regenerate and reset buttons
+        with col_btns:
+            st.markdown("<div style='height: 110px;'></div>", unsafe_allow_html=True)  # Button alignment
+            b1, b2 = st.columns([1, 1])
+
+            with b1:
+                if st.button(f"🔄 Regenerate", key=f"regen_{header}", help="Regenerate"):
+                    regen_parts = []
+                    regen_stats = {}
+
+                    def show_regen_delta(delta):
+                        regen_parts.append(delta)
+                        regen_preview.markdown("".join(regen_parts))
+
+                    # Use a rewrite prefetched for this exact content if there is one
+                    regenerated = None
+                    if prefetcher is not None:
+                        regenerated = prefetcher.take(header, st.session_state.current_sections[header])
+                    if regenerated is not None:
+                        regen_preview.markdown(regenerated)
+                        st.caption("⚡ Prefetched rewrite")
+                    else:
+                        regenerated = regenerate_section_with_llm(
+                            header, st.session_state.current_sections[header],
+                            on_delta=show_regen_delta, stats=regen_stats
+                        )
+                    st.session_state.current_sections[header] = regenerated
+                    if "time_to_first_token" in regen_stats:
+                        st.caption(f"⚡ {regen_stats['time_to_first_token']:.2f}s to first token")
+
+            with b2:
+                if st.button(f"♻️ Reset", key=f"reset_{header}", help="Reset"):
+                    st.session_state.current_sections[header] = original_sections[header]
+                    
+        # # Full feedback in an expander
+        # full_score_text = data["section_scores"].get(header, {}).get("feedback", "").strip()
+        # if full_score_text:
+        #     with st.expander(f"📊 Score & Feedback for '{header}'", expanded=True):
+        #         st.markdown(full_score_text)
+
+    # Queue re-scoring of sections edited since they were last scored (debounced, in the background)
+    current_sections = {header: st.session_state.current_sections[header] for header in original_sections}
+    if rescorer is not None:
+        rescorer.update(current_sections)
+        watch_rescoring()
+
+    # Drop prefetched rewrites of edited sections; prefetch for sections re-scored low (within the budget)
+    if prefetcher is not None:
+        prefetcher.discard_stale(current_sections)
+        if prefetch_enabled:
+            prefetcher.prefetch(
+                {header: content for header, content in current_sections.items()
+                 if rescorer is None or not rescorer.is_pending(header)},
+                data["section_scores"]
+            )
+
     st.markdown("---")
     st.markdown("### 📈 Section Scores Overview")
 
     # Prepare data for bar chart visualization of section scores
     chart_data = []
-    for sec, feedback in data["section_scores"].items():
-        match = re.search(r"(\d{1,2})\s*/\s*10", feedback)
-        if match:
-            chart_data.append((sec, int(match.group(1).split("/")[0])))
+    for sec, entry in data["section_scores"].items():
+        if entry["score"] is not None:
+            chart_data.append((sec, entry["score"]))
 
     if chart_data:
         df_chart = pd.DataFrame(chart_data, columns=["Section", "Score"])
@@ -209,35 +376,40 @@ if st.session_state.resume_data:
         final_resume += f"=== {section} ===\n{content.strip()}\n\n"
         # final_resume += f"{section}\n{'-' * len(section)}\n{content.strip()}\n\n"
 
-    # Export final resume in DOCX and PDF
-    docx_bytes = export_to_docx(final_resume)
-    st.download_button("⬇️ Download as DOCX", docx_bytes, "structured_resume.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
-
-    pdf_bytes = export_to_pdf(final_resume)
-    st.download_button("⬇️ Download as PDF", pdf_bytes, "structured_resume.pdf", "application/pdf")
+    # Export final resume in DOCX and PDF (rendered on request)
+    lazy_download_button("⬇️ Download as DOCX", final_resume, "docx", "structured_resume.docx")
+    lazy_download_button("⬇️ Download as PDF", final_resume, "pdf", "structured_resume.pdf")
 
     # Export AI-optimized resume (no manual edits)
     st.markdown("<br>", unsafe_allow_html=True)
     
     st.markdown("### 🧠 Download AI-Optimized Resume (No Manual Edits)")
-    opt_docx = export_to_docx(data['optimized_resume'])
-    st.download_button("⬇️ Download Optimized Resume as DOCX", opt_docx, "optimized_resume.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
-
-    opt_pdf = export_to_pdf(data['optimized_resume'])
-    st.download_button("⬇️ Download Optimized Resume as PDF", opt_pdf, "optimized_resume.pdf", "application/pdf")
+    lazy_download_button("⬇️ Download Optimized Resume as DOCX", data['optimized_resume'], "docx", "optimized_resume.docx")
+    lazy_download_button("⬇️ Download Optimized Resume as PDF", data['optimized_resume'], "pdf", "optimized_resume.pdf")
 
     # Export only section scores and feedback
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("### 📊 Download Section Scores & Feedback Only")
     score_summary = ""
-    for section, full_score_text in data["section_scores"].items():
-        score_summary += f"=== {section} ===\n{full_score_text.strip()}\n\n"
-
-    score_docx = export_to_docx(score_summary)
-    st.download_button("⬇️ Download Scores as DOCX", score_docx, "resume_scores.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
-
-    score_pdf = export_to_pdf(score_summary)
-    st.download_button("⬇️ Download Scores as PDF", score_pdf, "resume_scores.pdf", "application/pdf")
+    for section, entry in data["section_scores"].items():
+        score_line = f"Score: {entry['score']}/10\n" if entry["score"] is not None else ""
+        score_summary += f"=== {section} ===\n{score_line}{entry['feedback'].strip()}\n\n"
+
+    lazy_download_button("⬇️ Download Scores as DOCX", score_summary, "docx", "resume_scores.docx")
+    lazy_download_button("⬇️ Download Scores as PDF", score_summary, "pdf", "resume_scores.pdf")
+
+# Optional debug panel with per-stage timings and LLM call counters
+if st.sidebar.checkbox("🛠️ Show performance metrics"):
+    st.sidebar.subheader("⏱️ Stage timings (seconds)")
+    stage_summary = metrics.summary()
+    if stage_summary:
+        df_metrics = pd.DataFrame.from_dict(stage_summary, orient="index")
+        st.sidebar.dataframe(df_metrics.round(3), use_container_width=True)
+    else:
+        st.sidebar.caption("No stages recorded yet.")
+    st.sidebar.subheader("🔢 Counters")
+    st.sidebar.json(metrics.counters())
+    st.sidebar.download_button("⬇️ Prometheus metrics", metrics.prometheus_text(), "metrics.prom", "text/plain")
 
 # Footer
 st.markdown("---")
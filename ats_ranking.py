@@ -0,0 +1,121 @@
+# Corpus-level ATS ranking: score every resume against every job description with sparse matrix operations
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from backend import keyword_tokens
+
+
+def _tokenize_all(texts, workers=None):
+    """
+    Tokenize texts with the same rules as ats_keyword_check, optionally across processes.
+    """
+    if not workers or workers <= 1 or len(texts) < 2 * workers:
+        return [keyword_tokens(text) for text in texts]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(keyword_tokens, texts, chunksize=max(1, len(texts) // (workers * 8))))
+
+
+def _count_matrix(token_lists, vocab):
+    """
+    Build a documents x vocabulary sparse count matrix, growing `vocab` as new terms appear.
+    """
+    indptr, indices, data = [0], [], []
+    for tokens in token_lists:
+        for term, count in Counter(tokens).items():
+            indices.append(vocab.setdefault(term, len(vocab)))
+            data.append(count)
+        indptr.append(len(indices))
+    return indptr, indices, data
+
+
+def _top_terms_matrix(token_lists, vocab, top_n):
+    """
+    Build a binary documents x vocabulary matrix marking each document's top-N most frequent
+    terms, chosen exactly like extract_keywords (ties broken by first occurrence).
+    """
+    rows, cols = [], []
+    for row, tokens in enumerate(token_lists):
+        for term, _ in Counter(tokens).most_common(top_n):
+            rows.append(row)
+            cols.append(vocab[term])
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(token_lists), len(vocab))
+    )
+
+
+class ATSCorpus:
+    """
+    Sparse TF-IDF model over a pool of resumes and job descriptions.
+    Builds one term matrix for the whole corpus, then computes every resume x job
+    cosine similarity and ATS keyword coverage with vectorized sparse products.
+    `coverage_percent` matches ats_keyword_check for the same resume/job pair.
+    """
+
+    def __init__(self, resume_texts, jd_texts, top_n=50, workers=None):
+        tokens = _tokenize_all(list(resume_texts) + list(jd_texts), workers)
+        resume_tokens, jd_tokens = tokens[:len(resume_texts)], tokens[len(resume_texts):]
+        self.n_resumes, self.n_jobs = len(resume_tokens), len(jd_tokens)
+
+        vocab = {}
+        indptr, indices, data = _count_matrix(tokens, vocab)
+        counts = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), indices, indptr),
+            shape=(len(tokens), len(vocab))
+        )
+
+        # Smoothed IDF and L2-normalized sublinear TF-IDF rows
+        doc_freq = np.bincount(counts.indices, minlength=len(vocab))
+        idf = np.log((1 + len(tokens)) / (1 + doc_freq)) + 1
+        tfidf = counts.copy()
+        tfidf.data = 1 + np.log(tfidf.data)
+        tfidf = tfidf.multiply(idf.astype(np.float32)).tocsr()
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        tfidf = sparse.diags(1 / norms) @ tfidf
+
+        resume_tfidf, jd_tfidf = tfidf[:self.n_resumes], tfidf[self.n_resumes:]
+        self.similarity = (resume_tfidf @ jd_tfidf.T).toarray()
+
+        resume_top = _top_terms_matrix(resume_tokens, vocab, top_n)
+        jd_top = _top_terms_matrix(jd_tokens, vocab, top_n)
+        # float64 so rounded percentages equal ats_keyword_check's (float32 would give 14.289999...)
+        matches = (resume_top @ jd_top.T).toarray().astype(np.float64)
+        jd_sizes = np.asarray(jd_top.sum(axis=1), dtype=np.float64).ravel()
+        jd_sizes[jd_sizes == 0] = 1
+        self.coverage_percent = np.round(matches / jd_sizes * 100, 2)
+
+    def top_candidates(self, top_k=10, by="similarity"):
+        """
+        Return, for each job description, its top-k resumes as a list of
+        {"resume": index, "similarity": float, "coverage_percent": float}, best first.
+        `by` selects the ranking metric: "similarity" or "coverage".
+        """
+        scores = self.similarity if by == "similarity" else self.coverage_percent
+        k = min(top_k, self.n_resumes)
+        if k == 0:
+            return [[] for _ in range(self.n_jobs)]
+        ranked = []
+        for job in range(self.n_jobs):
+            column = scores[:, job]
+            best = np.argpartition(-column, k - 1)[:k]
+            best = best[np.argsort(-column[best], kind="stable")]
+            ranked.append([
+                {
+                    "resume": int(i),
+                    "similarity": round(float(self.similarity[i, job]), 4),
+                    "coverage_percent": float(self.coverage_percent[i, job])
+                }
+                for i in best
+            ])
+        return ranked
+
+
+def rank_candidates(resume_texts, jd_texts, top_k=10, by="similarity", workers=None):
+    """
+    Rank a pool of resumes against each job description and return the top-k per job.
+    """
+    return ATSCorpus(resume_texts, jd_texts, workers=workers).top_candidates(top_k=top_k, by=by)
@@ -1,77 +1,376 @@
 # Imports for file handling, NLP, PDF/Word processing, API requests, and temporary file creation
-import requests
+# spaCy and NLTK are imported lazily (see NLP RESOURCES below) so importing this module stays fast
 import PyPDF2
 import docx
-import spacy
-import nltk
+import docx.table
 import re
-from nltk.corpus import stopwords
 from docx import Document
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase import pdfmetrics
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
 import os
-from openai import OpenAI
+import hashlib
+import json
+import threading
+import time
+import queue
+from collections import Counter, OrderedDict
+from llm_cache import ResponseCache
+from jd_profiles import JDProfileStore
+from llm_client import LLMClient, iter_sse_events
+import metrics
+from prompt_budget import budget_skills, chunk_text, clean_text, estimate_tokens, truncate_to_tokens
+import section_parser
 from dotenv import load_dotenv
 load_dotenv()
 
+# Set your Perplexity API key here (checked when the first LLM call is made)
+PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 
-# Download necessary NLTK corpora
-nltk.download('punkt_tab')
-nltk.download('stopwords')
+# Upper bound on LLM requests issued at the same time by the concurrent helpers below
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "4"))
 
-# Set your Perplexity API key here
+# LLM model and on-disk response cache settings (set RESUME_REFINER_CACHE_PATH to "off" to disable caching)
+PERPLEXITY_MODEL = "sonar-pro"
+PERPLEXITY_API_URL = os.getenv("PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions")
+CACHE_PATH = os.getenv("RESUME_REFINER_CACHE_PATH", ".llm_cache.sqlite3")
+CACHE_MAX_ENTRIES = int(os.getenv("RESUME_REFINER_CACHE_MAX_ENTRIES", "5000"))
+CACHE_TTL = float(os.getenv("RESUME_REFINER_CACHE_TTL", "0")) or None
 
-PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
-if not PERPLEXITY_API_KEY:
-    raise ValueError("Perplexity API key not found. Please set the PERPLEXITY_API_KEY environment variable.")
+# Job description profiles (skillset and keyword frequencies) are persisted here; "off" keeps them in memory only
+JD_PROFILE_PATH = os.getenv("RESUME_REFINER_JD_PROFILES_PATH", ".jd_profiles.sqlite3")
 
-load_dotenv()
-# client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-# Load spaCy's English language model
-nlp = spacy.load("en_core_web_sm")
+# Prompt budgets in estimated tokens: resumes longer than RESUME_CHUNK_TOKENS are split into chunks
+# processed in parallel, job descriptions and skill lists are trimmed to their budgets
+RESUME_CHUNK_TOKENS = int(os.getenv("RESUME_CHUNK_TOKENS", "3000"))
+JD_TOKEN_BUDGET = int(os.getenv("JD_TOKEN_BUDGET", "1500"))
+SKILLS_TOKEN_BUDGET = int(os.getenv("SKILLS_TOKEN_BUDGET", "300"))
+
+# Local section parsing is trusted at or above this confidence (0-1); below it the LLM parser is used
+SECTION_PARSER_MIN_CONFIDENCE = float(os.getenv("SECTION_PARSER_MIN_CONFIDENCE", str(section_parser.DEFAULT_MIN_CONFIDENCE)))
+
+# HTTP client settings: timeout per request, retry budget and process-wide request rate limit
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "2"))
+# To call OpenAI instead: from openai import OpenAI; client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# -----------------------------------------------
+# NLP RESOURCES (LOADED ON FIRST USE)
+# -----------------------------------------------
+
+_nlp_lock = threading.Lock()
+_nlp = None
+_stop_words = None
+_nltk_ready = set()
+
+def _ensure_nltk_resource(resource_path, package):
+    """
+    Make sure an NLTK resource is installed, checking the local data path first
+    and only downloading when it is genuinely missing.
+    """
+    if package in _nltk_ready:
+        return
+    import nltk
+    try:
+        nltk.data.find(resource_path)
+    except LookupError:
+        nltk.download(package, quiet=True)
+    _nltk_ready.add(package)
+
+def get_nlp():
+    """
+    Return spaCy's English language model, loading it on first use.
+    """
+    global _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            _nlp = spacy.load("en_core_web_sm")
+    return _nlp
+
+_tokenizer = None
 
-# Define stopwords set for keyword filtering
-stop_words = set(stopwords.words('english'))
+def get_tokenizer():
+    """
+    Return a tokenizer-only English spaCy pipeline (no tagger, parser or NER), loading it on first use.
+    It applies the same tokenization rules as en_core_web_sm at a fraction of the cost.
+    """
+    global _tokenizer
+    with _nlp_lock:
+        if _tokenizer is None:
+            import spacy
+            _tokenizer = spacy.blank("en")
+    return _tokenizer
+
+def get_stop_words():
+    """
+    Return the English stopword set used for keyword filtering, loading it on first use.
+    """
+    global _stop_words
+    with _nlp_lock:
+        if _stop_words is None:
+            _ensure_nltk_resource("corpora/stopwords", "stopwords")
+            from nltk.corpus import stopwords
+            _stop_words = set(stopwords.words('english'))
+    return _stop_words
 
 # -----------------------------------------------
 # TEXT EXTRACTION FUNCTIONS
 # -----------------------------------------------
 
-def extract_text(resume_file):
+# PDFs with at least this many pages are extracted across a process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "0")) or os.cpu_count() or 1
+EXTRACTION_CACHE_SIZE = 16
+_extraction_cache = OrderedDict()
+_extraction_cache_lock = threading.Lock()
+
+def _read_file_bytes(resume_file):
     """
-    Extract text from a resume file (PDF or DOCX).
+    Return the raw bytes of an uploaded file or an open binary file object.
+    """
+    if hasattr(resume_file, "getvalue"):
+        return resume_file.getvalue()
+    if hasattr(resume_file, "seek"):
+        resume_file.seek(0)
+    return resume_file.read()
+
+def _extract_pdf_page_range(data, start, stop):
+    """
+    Extract the text of pages [start, stop) from PDF bytes (runs in a worker process).
+    """
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _iter_pdf_pages(data, max_pages=None, max_workers=None):
+    """
+    Yield the text of each PDF page in order. Large documents are split into page
+    ranges that are extracted in parallel by a process pool.
+    """
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    page_count = len(reader.pages) if max_pages is None else min(max_pages, len(reader.pages))
+    workers = min(max_workers or EXTRACTION_WORKERS, page_count)
+    if page_count < PDF_PARALLEL_MIN_PAGES or workers <= 1:
+        for i in range(page_count):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    chunk = -(-page_count // (workers * 2))
+    starts = list(range(0, page_count, chunk))
+    stops = [min(start + chunk, page_count) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for pages in executor.map(_extract_pdf_page_range, [data] * len(starts), starts, stops):
+            yield from pages
+
+def _iter_docx_blocks(data):
     """
-    if resume_file.name.endswith(".pdf"):
-        reader = PyPDF2.PdfReader(resume_file)
-        return "".join([page.extract_text() for page in reader.pages])
-    elif resume_file.name.endswith(".docx"):
-        doc = docx.Document(resume_file)
-        return "\n".join([p.text for p in doc.paragraphs])
+    Yield the text of each paragraph and table row of a DOCX file in document order.
+    Table cells are joined with " | "; cells repeated by horizontal merges are kept once.
+    """
+    doc = docx.Document(BytesIO(data))
+    for block in doc.iter_inner_content():
+        if isinstance(block, docx.table.Table):
+            for row in block.rows:
+                cells = []
+                for cell in row.cells:
+                    text = cell.text.strip()
+                    if text and (not cells or cells[-1] != text):
+                        cells.append(text)
+                if cells:
+                    yield " | ".join(cells)
+        else:
+            yield block.text
+
+def iter_extracted_text(resume_file, max_pages=None):
+    """
+    Stream the text of a resume file (PDF or DOCX) piece by piece: one item per PDF page,
+    or per DOCX paragraph/table row. Results are cached by a hash of the file bytes,
+    so re-uploads and reruns of the same file are served from memory.
+    """
+    name = resume_file.name.lower()
+    if name.endswith(".pdf"):
+        kind = "pdf"
+    elif name.endswith(".docx"):
+        kind = "docx"
     else:
-        return "Unsupported file type."
+        yield "Unsupported file type."
+        return
+
+    data = _read_file_bytes(resume_file)
+    key = (hashlib.sha256(data).hexdigest(), kind, max_pages)
+    with _extraction_cache_lock:
+        cached = _extraction_cache.get(key)
+        if cached is not None:
+            _extraction_cache.move_to_end(key)
+    if cached is not None:
+        yield from cached
+        return
+
+    pieces = []
+    source = _iter_pdf_pages(data, max_pages) if kind == "pdf" else _iter_docx_blocks(data)
+    for piece in source:
+        pieces.append(piece)
+        yield piece
+    with _extraction_cache_lock:
+        _extraction_cache[key] = pieces
+        while len(_extraction_cache) > EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+
+def extract_text(resume_file, max_pages=None):
+    """
+    Extract text from a resume file (PDF or DOCX).
+    PDF pages are separated by newlines; `max_pages` optionally caps how many PDF pages are read.
+    """
+    return "\n".join(iter_extracted_text(resume_file, max_pages=max_pages))
+
+# -----------------------------------------------
+# ANALYZED DOCUMENTS
+# -----------------------------------------------
+
+_SECTION_PATTERN = re.compile(r'=== (.*?) ===\n(.*?)(?=(?:===|\Z))', re.DOTALL)
+DOCUMENT_CACHE_SIZE = 64
+_document_cache = OrderedDict()
+_document_cache_lock = threading.Lock()
+
+class AnalyzedDocument:
+    """
+    A text tokenized once and shared by every analysis that reads it (ATS keywords,
+    skill matching, section splitting). Tokens and every view of them are built on first use,
+    so section splitting alone never runs the tokenizer.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._tokens = None
+        self._spaced = None
+        self._normalized = None
+        self._keywords = None
+        self._keyword_counts = None
+        self._sections = None
+
+    @property
+    def tokens(self):
+        """
+        Token texts from the tokenizer-only spaCy pipeline.
+        """
+        if self._tokens is None:
+            doc = get_tokenizer().make_doc(self.text)
+            self._spaced = [bool(token.whitespace_) for token in doc]
+            self._tokens = [token.text for token in doc]
+        return self._tokens
+
+    @property
+    def normalized(self):
+        """
+        Lowercased tokens.
+        """
+        if self._normalized is None:
+            self._normalized = [token.lower() for token in self.tokens]
+        return self._normalized
+
+    def _joined_words(self):
+        """
+        Lowercased tokens with infix-hyphen and slash spans ("e-commerce", "a/b") rejoined into one word.
+        """
+        tokens, spaced = self.normalized, self._spaced
+        words, i = [], 0
+        while i < len(tokens):
+            word = tokens[i]
+            while (i + 2 < len(tokens) and tokens[i + 1] in ("-", "/")
+                   and not spaced[i] and not spaced[i + 1] and tokens[i + 2].isalpha()):
+                word += tokens[i + 1] + tokens[i + 2]
+                i += 2
+            words.append(word)
+            i += 1
+        return words
+
+    @property
+    def keywords(self):
+        """
+        Lowercase alphabetic (optionally hyphen- or slash-joined), non-stopword words of two or more
+        characters in document order (the keyword candidates).
+        """
+        if self._keywords is None:
+            stop_words = get_stop_words()
+            self._keywords = [
+                w for w in self._joined_words()
+                if len(w) > 1 and w.replace("-", "").replace("/", "").isalpha() and w not in stop_words
+            ]
+        return self._keywords
+
+    @property
+    def keyword_counts(self):
+        """
+        Frequency of each keyword candidate, in first-occurrence order.
+        """
+        if self._keyword_counts is None:
+            self._keyword_counts = Counter(self.keywords)
+        return self._keyword_counts
+
+    def top_keywords(self, top_n):
+        """
+        Return the `top_n` most frequent keywords, ties broken by first occurrence.
+        """
+        return [word for word, _ in self.keyword_counts.most_common(top_n)]
+
+    @property
+    def sections(self):
+        """
+        "=== Section ===" blocks as (title, content, (start, end)) with the content's character span.
+        """
+        if self._sections is None:
+            self._sections = [
+                (match.group(1).strip(), match.group(2).strip(), match.span(2))
+                for match in _SECTION_PATTERN.finditer(self.text)
+            ]
+        return self._sections
+
+def analyze_document(text):
+    """
+    Return the AnalyzedDocument for `text`, cached by content hash so the resume and job
+    description are tokenized once per analysis however many stages read them.
+    """
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    with _document_cache_lock:
+        document = _document_cache.get(key)
+        if document is not None:
+            _document_cache.move_to_end(key)
+            return document
+    document = AnalyzedDocument(text)
+    with _document_cache_lock:
+        _document_cache[key] = document
+        while len(_document_cache) > DOCUMENT_CACHE_SIZE:
+            _document_cache.popitem(last=False)
+    return document
 
 # -----------------------------------------------
 # KEYWORD & SKILL MATCHING (ATS)
 # -----------------------------------------------
 
+def keyword_tokens(text):
+    """
+    Tokenize text into lowercase alphabetic, non-stopword tokens (the keyword candidates).
+    """
+    return list(analyze_document(text).keywords)
+
 def extract_keywords(text, top_n=10):
     """
     Tokenize and return top N frequent keywords from given text.
     Filters out stopwords and non-alphabetic tokens.
     """
-    words = nltk.word_tokenize(text)
-    words = [w.lower() for w in words if w.isalpha() and w.lower() not in stop_words]
-    freq_dist = nltk.FreqDist(words)
-    return [word for word, freq in freq_dist.most_common(top_n)]
+    return analyze_document(text).top_keywords(top_n)
 
 def ats_keyword_check(resume_text, job_desc):
     """
     Compare resume and job description to identify keyword overlap for ATS scoring.
+    Job description keywords come from its stored JDProfile.
     """
     resume_keywords = set(extract_keywords(resume_text, 50))
-    jd_keywords = set(extract_keywords(job_desc, 50))
+    jd_keywords = set(get_jd_profile(job_desc).top_keywords(50))
     matching = resume_keywords & jd_keywords
     coverage = len(matching) / (len(jd_keywords) or 1)
     suggestions = jd_keywords - resume_keywords
@@ -119,49 +418,107 @@ def export_to_docx(text):
     return buffer
 
 
+_BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
+
+class _FontWidthTable:
+    """
+    Cached glyph and word widths for one font at 1pt, so wrapping never calls into
+    ReportLab's string measurement for a word it has already seen.
+    """
+    MAX_WORDS = 50000
+
+    def __init__(self, font):
+        self.font = font
+        self.chars = {}
+        self.words = {}
+
+    def width(self, word, size):
+        width = self.words.get(word)
+        if width is None:
+            width = 0.0
+            for ch in word:
+                ch_width = self.chars.get(ch)
+                if ch_width is None:
+                    ch_width = self.chars[ch] = pdfmetrics.stringWidth(ch, self.font, 1000) / 1000.0
+                width += ch_width
+            if len(self.words) >= self.MAX_WORDS:
+                self.words.clear()
+            self.words[word] = width
+        return width * size
+
+_font_width_tables = {}
+
+def _width_table(font):
+    table = _font_width_tables.get(font)
+    if table is None:
+        table = _font_width_tables.setdefault(font, _FontWidthTable(font))
+    return table
+
+def _split_bold_parts(line):
+    """
+    Split a line into (text, is_bold) parts using **bold** markup.
+    """
+    parts = []
+    last = 0
+    for match in _BOLD_PATTERN.finditer(line):
+        if match.start() > last:
+            parts.append((line[last:match.start()], False))
+        parts.append((match.group(1), True))
+        last = match.end()
+    if last < len(line):
+        parts.append((line[last:], False))
+    return parts
+
 def export_to_pdf(text):
-    """Exports resume text to a formatted PDF file, with basic bold handling."""
+    """
+    Exports resume text to a formatted PDF file, with basic bold handling.
+    Words are measured with cached per-font width tables, each line is wrapped in a
+    single pass, and every page is drawn through one text object with font switches
+    only where the font actually changes.
+    """
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
     x_margin = 40
-    max_width = width - 2 * x_margin
-    y = height - 40
+    right_edge = width - x_margin
+    top = height - 40
+    y = top
     font_size = 11
 
     normal_font = "Helvetica"
     bold_font = "Helvetica-Bold"
+    widths = {normal_font: _width_table(normal_font), bold_font: _width_table(bold_font)}
 
     line_spacing = 10
-    section_spacing = 15
 
-    def draw_wrapped_line(parts):
-        nonlocal y
-        x = x_margin
+    text_obj = c.beginText()
+    current_font = None
+    page_has_text = False
 
-        for part, is_bold in parts:
-            font = bold_font if is_bold else normal_font
-            c.setFont(font, font_size)
+    def emit(line_y, segments):
+        # Draw one visual line: [(font, text), ...] starting at the left margin
+        nonlocal current_font, page_has_text
+        if not segments:
+            return
+        page_has_text = True
+        text_obj.setTextOrigin(x_margin, line_y)
+        for font, segment in segments:
+            if font != current_font:
+                text_obj.setFont(font, font_size)
+                current_font = font
+            text_obj.textOut(segment)
 
-            # Split part into words and wrap manually
-            words = part.split()
-            for word in words:
-                word_width = c.stringWidth(word + ' ', font, font_size)
-                if x + word_width > width - x_margin:
-                    y -= line_spacing
-                    x = x_margin
-                    if y < 40:
-                        c.showPage()
-                        y = height - 40
-                        c.setFont(font, font_size)
-                c.drawString(x, y, word + ' ')
-                x += word_width
-        y -= line_spacing
-        if y < 40:
-            c.showPage()
-            y = height - 40
+    def flush_text():
+        if page_has_text:
+            c.drawText(text_obj)
 
-    bold_pattern = re.compile(r'\*\*(.*?)\*\*')
+    def new_page():
+        nonlocal text_obj, current_font, page_has_text
+        flush_text()
+        c.showPage()
+        text_obj = c.beginText()
+        current_font = None
+        page_has_text = False
 
     for line in text.strip().split('\n'):
         line = line.strip()
@@ -170,48 +527,159 @@ def export_to_pdf(text):
             continue
 
         if line.startswith("[Score & Feedback]"):
-            c.setFont(bold_font, font_size)
-            c.drawString(x_margin, y, "Score & Feedback:")
+            emit(y, [(bold_font, "Score & Feedback:")])
             y -= line_spacing
             continue
 
-        parts = []
-        last = 0
-        for match in bold_pattern.finditer(line):
-            if match.start() > last:
-                parts.append((line[last:match.start()], False))
-            parts.append((match.group(1), True))
-            last = match.end()
-        if last < len(line):
-            parts.append((line[last:], False))
-
-        draw_wrapped_line(parts)
+        x = x_margin
+        segments = []
+        for part, is_bold in _split_bold_parts(line):
+            font = bold_font if is_bold else normal_font
+            table = widths[font]
+            for word in part.split():
+                word = word + ' '
+                word_width = table.width(word, font_size)
+                if x + word_width > right_edge:
+                    emit(y, segments)
+                    segments = []
+                    y -= line_spacing
+                    x = x_margin
+                    if y < 40:
+                        new_page()
+                        y = top
+                if segments and segments[-1][0] == font:
+                    segments[-1] = (font, segments[-1][1] + word)
+                else:
+                    segments.append((font, word))
+                x += word_width
+        emit(y, segments)
+        y -= line_spacing
+        if y < 40:
+            new_page()
+            y = top
 
+    flush_text()
     c.save()
     buffer.seek(0)
     return buffer
 
+EXPORT_CACHE_SIZE = 32
+_export_cache = OrderedDict()
+_export_cache_lock = threading.Lock()
+_exporters = {"docx": export_to_docx, "pdf": export_to_pdf}
+
+def export_document(text, fmt):
+    """
+    Render text to "docx" or "pdf" bytes, memoized by a hash of the content and format.
+    Unchanged content is never re-rendered; the least recently used renders are evicted
+    once EXPORT_CACHE_SIZE documents are cached.
+    """
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), fmt)
+    with _export_cache_lock:
+        if key in _export_cache:
+            _export_cache.move_to_end(key)
+            metrics.increment("export_cache_hits_total")
+            return _export_cache[key]
+    with metrics.timed(f"export.{fmt}", input_chars=len(text)) as info:
+        rendered = _exporters[fmt](text).getvalue()
+        info["output_bytes"] = len(rendered)
+    with _export_cache_lock:
+        _export_cache[key] = rendered
+        while len(_export_cache) > EXPORT_CACHE_SIZE:
+            _export_cache.popitem(last=False)
+    return rendered
+
 # -----------------------------------------------
 # PERPLEXITY LLM INTEGRATION
 # -----------------------------------------------
 
-def call_perplexity(prompt):
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Return the shared LLM response cache, or None when caching is disabled.
+    """
+    global _response_cache
+    if CACHE_PATH.lower() in ("", "off", "none"):
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+    return _response_cache
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+def get_llm_client():
+    """
+    Return the process-wide pooled LLM client shared by all concurrent callers.
+    """
+    global _llm_client
+    if not PERPLEXITY_API_KEY:
+        raise ValueError("Perplexity API key not found. Please set the PERPLEXITY_API_KEY environment variable.")
+    with _llm_client_lock:
+        if _llm_client is None:
+            _llm_client = LLMClient(
+                PERPLEXITY_API_URL,
+                PERPLEXITY_API_KEY,
+                timeout=LLM_TIMEOUT,
+                max_retries=LLM_MAX_RETRIES,
+                requests_per_second=LLM_REQUESTS_PER_SECOND,
+                pool_size=max(10, MAX_CONCURRENT_LLM_CALLS)
+            )
+    return _llm_client
+
+def _record_llm_response(info, response, usage):
+    """
+    Add retry count and API token usage of one LLM response to its metrics record.
+    """
+    info["retries"] = getattr(response, "retries", 0)
+    metrics.increment("llm_requests_total")
+    metrics.increment("llm_retries_total", info["retries"])
+    for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        if usage and usage.get(field) is not None:
+            info[field] = usage[field]
+            metrics.increment(f"llm_{field}_total", usage[field])
+
+def _lookup_cache(cache, cache_key, use_cache):
+    """
+    Return the cached response (or None) and count the hit or miss.
+    """
+    if not (cache and use_cache):
+        return None
+    cached = cache.get(cache_key)
+    metrics.increment("llm_cache_hits_total" if cached is not None else "llm_cache_misses_total")
+    return cached
+
+def call_perplexity(prompt, use_cache=True):
     """
     Call Perplexity LLM API with the given prompt.
+    Responses are served from the local cache when available; pass use_cache=False
+    to force a fresh answer (the fresh answer still replaces the cached one).
     Returns the response as plain text.
     """
-    url = "https://api.perplexity.ai/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "sonar-pro",
-        "messages": [{"role": "user", "content": prompt}]
-    }
-    response = requests.post(url, headers=headers, json=data)
-    response.raise_for_status()
-    return response.json()['choices'][0]['message']['content']
+    with metrics.timed("llm.call", prompt_chars=len(prompt)) as info:
+        cache = get_response_cache()
+        cache_key = ResponseCache.make_key(PERPLEXITY_MODEL, prompt)
+        cached = _lookup_cache(cache, cache_key, use_cache)
+        info["cache_hit"] = cached is not None
+        if cached is not None:
+            info["response_chars"] = len(cached)
+            return cached
+
+        data = {
+            "model": PERPLEXITY_MODEL,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        response = get_llm_client().post(data)
+        body = response.json()
+        content = body['choices'][0]['message']['content']
+        info["response_chars"] = len(content)
+        _record_llm_response(info, response, body.get("usage"))
+        if cache:
+            cache.set(cache_key, content)
+        return content
     # if you want to call open ai 
     # response = client.chat.completions.create(
     #     model="gpt-3.5-turbo",
@@ -222,51 +690,364 @@ def call_perplexity(prompt):
 
     # print(response.choices[0].message.content)
 
+def stream_perplexity(prompt, use_cache=True, stats=None):
+    """
+    Streaming variant of call_perplexity: yields text deltas as the completion arrives.
+    The joined deltas equal what call_perplexity returns for the same prompt, and the
+    assembled text is written to the response cache once the stream completes.
+    If a `stats` dict is given, it receives time_to_first_token and total_time in seconds.
+    """
+    start = time.perf_counter()
+    stats = {} if stats is None else stats
+    info = {"prompt_chars": len(prompt)}
+    cache = get_response_cache()
+    cache_key = ResponseCache.make_key(PERPLEXITY_MODEL, prompt)
+    cached = _lookup_cache(cache, cache_key, use_cache)
+    if cached is not None:
+        stats["time_to_first_token"] = stats["total_time"] = time.perf_counter() - start
+        metrics.observe("llm.stream", stats["total_time"], cache_hit=True, response_chars=len(cached), **info)
+        yield cached
+        return
+
+    data = {
+        "model": PERPLEXITY_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": True
+    }
+    parts = []
+    usage = None
+    try:
+        response = get_llm_client().post(data, stream=True)
+        for event in iter_sse_events(response):
+            usage = event.get("usage") or usage
+            choices = event.get("choices") or [{}]
+            delta = (choices[0].get("delta") or {}).get("content")
+            if not delta:
+                continue
+            if not parts:
+                stats["time_to_first_token"] = time.perf_counter() - start
+            parts.append(delta)
+            yield delta
+    except Exception:
+        metrics.observe("llm.stream", time.perf_counter() - start, error=True, **info)
+        raise
+
+    stats["total_time"] = time.perf_counter() - start
+    _record_llm_response(info, response, usage)
+    metrics.observe("llm.stream", stats["total_time"], cache_hit=False, response_chars=sum(map(len, parts)),
+                    time_to_first_token=stats.get("time_to_first_token"), **info)
+    if cache:
+        cache.set(cache_key, "".join(parts))
+
+def _complete(prompt, use_cache=True, on_delta=None, stats=None):
+    """
+    Run a prompt through the blocking or the streaming API path.
+    With `on_delta`, each text delta is passed to it as it arrives; the full text is returned either way.
+    """
+    if on_delta is None:
+        return call_perplexity(prompt, use_cache=use_cache)
+    parts = []
+    for delta in stream_perplexity(prompt, use_cache=use_cache, stats=stats):
+        on_delta(delta)
+        parts.append(delta)
+    return "".join(parts)
+
 # -----------------------------------------------
 # SKILL EXTRACTION / PARSING
 # -----------------------------------------------
 
 def fetch_dynamic_skillset_from_perplexity(job_desc):
     """
-    Uses LLM to extract up to 50 relevant skills from the job description.
+    Uses LLM to extract up to 50 relevant skills from the job description
+    (cleaned and trimmed to JD_TOKEN_BUDGET).
     Returns a set of normalized skill terms.
     """
     prompt = (
         "Extract a list of up to 50 relevant technical and soft skills from the following job description. "
         "Only return a comma-separated list of skill names, no explanations:\n\n"
-        + job_desc
+        + truncate_to_tokens(clean_text(job_desc), JD_TOKEN_BUDGET)
     )
     skills_raw = call_perplexity(prompt)
     skills = re.split(r',\s*|\n', skills_raw)
     return set(skill.strip().lower() for skill in skills if skill.strip())
 
+def _spacy_tokens(text):
+    """
+    Tokenize text with the tokenizer-only spaCy pipeline.
+    """
+    return [token.text for token in get_tokenizer().make_doc(text)]
+
+class SkillIndex:
+    """
+    Compiled skill matcher built once from a skillset and reusable across many documents.
+    Skills are stored in a token trie, so multi-word skills such as "machine learning"
+    or "ci/cd" are matched in a single left-to-right pass over the document tokens.
+    """
+
+    def __init__(self, skillset, tokenize=None):
+        self.tokenize = tokenize or _spacy_tokens
+        self._trie = {}
+        self.max_depth = 0  # tokens in the longest skill
+        for skill in skillset:
+            tokens = [t.lower() for t in self.tokenize(skill) if t.strip()]
+            if not tokens:
+                continue
+            self.max_depth = max(self.max_depth, len(tokens))
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[None] = skill
+
+    def match_tokens(self, tokens):
+        """
+        Return the set of skills whose token sequence occurs in the given lowercased tokens.
+        """
+        if not isinstance(tokens, list):
+            tokens = list(tokens)
+        found = set()
+        count = len(tokens)
+        for start in range(count):
+            node = self._trie
+            # Walk at most max_depth tokens from each start, so matching stays linear in the document
+            for i in range(start, min(start + self.max_depth, count)):
+                node = node.get(tokens[i])
+                if node is None:
+                    break
+                if None in node:
+                    found.add(node[None])
+        return found
+
+    def match(self, text):
+        """
+        Return the set of skills mentioned in `text`.
+        """
+        return self.match_tokens(t.lower() for t in self.tokenize(text))
+
+_skill_indexes = OrderedDict()
+_skill_indexes_lock = threading.Lock()
+SKILL_INDEX_CACHE_SIZE = 32
+
+def get_skill_index(skillset):
+    """
+    Return the compiled SkillIndex for a skillset, building it once and keeping
+    the most recently used indexes in a small bounded cache.
+    """
+    key = frozenset(skillset)
+    with _skill_indexes_lock:
+        if key in _skill_indexes:
+            _skill_indexes.move_to_end(key)
+            return _skill_indexes[key]
+    index = SkillIndex(key)
+    with _skill_indexes_lock:
+        _skill_indexes[key] = index
+        while len(_skill_indexes) > SKILL_INDEX_CACHE_SIZE:
+            _skill_indexes.popitem(last=False)
+    return index
+
 def extract_skills(text, skillset):
     """
     Extract known skills from resume text using a given skillset.
+    Matches single- and multi-word skills with a compiled, cached SkillIndex
+    over the text's shared AnalyzedDocument tokens (matching is case-insensitive).
     Returns a set of matched skills.
     """
-    doc = nlp(text)
-    return set(token.text.lower() for token in doc if token.text.lower() in skillset)
+    return get_skill_index(skillset).match_tokens(analyze_document(text).normalized)
+
+# -----------------------------------------------
+# JOB DESCRIPTION PROFILES
+# -----------------------------------------------
+
+JD_PROFILE_CACHE_SIZE = 64
+_jd_profiles = OrderedDict()
+_jd_profiles_lock = threading.Lock()
+_jd_profile_store = None
+
+class JDProfile:
+    """
+    Everything derived from a job description once and reused for every resume checked against it:
+    keyword frequencies, the LLM-derived skillset (fetched on first use) and the skills the JD mentions.
+    """
+
+    def __init__(self, job_desc, key, role=None, keyword_counts=None, skillset=None):
+        self.job_desc = job_desc
+        self.key = key
+        self.role = role
+        if keyword_counts is None:
+            keyword_counts = analyze_document(job_desc).keyword_counts
+        self.keyword_counts = Counter(keyword_counts)
+        self._skillset = None if skillset is None else set(skillset)
+        self._jd_skills = {}
+        self._lock = threading.Lock()
+
+    @property
+    def skillset(self):
+        """
+        The LLM-derived skillset, fetched once and saved with the profile.
+        """
+        with self._lock:
+            if self._skillset is None:
+                self._skillset = fetch_dynamic_skillset_from_perplexity(self.job_desc)
+                _save_jd_profile(self)
+        return self._skillset
+
+    @property
+    def skill_index(self):
+        """
+        The compiled SkillIndex for this profile's skillset.
+        """
+        return get_skill_index(self.skillset)
+
+    def top_keywords(self, top_n):
+        """
+        Return the `top_n` most frequent JD keywords, ties broken by first occurrence.
+        """
+        return [word for word, _ in self.keyword_counts.most_common(top_n)]
+
+    def jd_skills(self, skillset=None):
+        """
+        Return the skills from `skillset` (default: the profile's own) mentioned in the job description.
+        """
+        key = frozenset(self.skillset if skillset is None else skillset)
+        with self._lock:
+            found = self._jd_skills.get(key)
+        if found is None:
+            found = extract_skills(self.job_desc, key)
+            with self._lock:
+                self._jd_skills[key] = found
+        return found
+
+def get_jd_profile_store():
+    """
+    Return the shared on-disk JD profile store, or None when persistence is disabled.
+    """
+    global _jd_profile_store
+    if JD_PROFILE_PATH.lower() in ("", "off", "none"):
+        return None
+    with _jd_profiles_lock:
+        if _jd_profile_store is None:
+            _jd_profile_store = JDProfileStore(JD_PROFILE_PATH)
+    return _jd_profile_store
+
+def _save_jd_profile(profile):
+    store = get_jd_profile_store()
+    if store is not None:
+        store.put(profile.key, profile.job_desc, dict(profile.keyword_counts),
+                  skillset=profile._skillset, role=profile.role)
+
+def get_jd_profile(job_desc=None, role=None):
+    """
+    Return the JDProfile for a job description, ingesting it on first sight.
+    With only `role`, load the job description last saved under that role name;
+    with both, (re)name the profile. Raises KeyError for an unknown role.
+    """
+    store = get_jd_profile_store()
+    if not (job_desc and job_desc.strip()):
+        stored = store.get_by_role(role) if store is not None and role else None
+        if stored is None:
+            with _jd_profiles_lock:
+                stored = next((p for p in reversed(_jd_profiles.values())
+                               if role and p.role and p.role.lower() == role.strip().lower()), None)
+            if stored is None:
+                raise KeyError(f"No saved job description for role '{role}'")
+            return stored
+        job_desc, role = stored["job_desc"], None
+
+    key = JDProfileStore.make_key(job_desc)
+    with _jd_profiles_lock:
+        profile = _jd_profiles.get(key)
+        if profile is not None:
+            _jd_profiles.move_to_end(key)
+    if profile is None:
+        stored = store.get(key) if store is not None else None
+        if stored is None:
+            metrics.increment("jd_profiles_ingested_total")
+            profile = JDProfile(job_desc, key)
+            _save_jd_profile(profile)
+        else:
+            profile = JDProfile(job_desc, key, stored["role"], stored["keyword_counts"], stored["skillset"])
+        with _jd_profiles_lock:
+            profile = _jd_profiles.setdefault(key, profile)
+            while len(_jd_profiles) > JD_PROFILE_CACHE_SIZE:
+                _jd_profiles.popitem(last=False)
+    if role and role.strip() and profile.role != role.strip():
+        profile.role = role.strip()
+        _save_jd_profile(profile)
+    return profile
+
+def saved_roles():
+    """
+    Return the role names with a saved job description, most recent first.
+    """
+    store = get_jd_profile_store()
+    if store is not None:
+        return store.roles()
+    with _jd_profiles_lock:
+        return [p.role for p in reversed(_jd_profiles.values()) if p.role]
 
 # -----------------------------------------------
 # STRUCTURED SECTION PARSING VIA LLM
 # -----------------------------------------------
 
+def _map_prompts(prompts):
+    """
+    Run several prompts concurrently and return their responses in order.
+    """
+    workers = max(1, min(MAX_CONCURRENT_LLM_CALLS, len(prompts)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(call_perplexity, prompts))
+
+def _merge_section_blocks(parsed_chunks):
+    """
+    Merge structured outputs of several resume chunks into one "=== Section ===" document.
+    Sections repeated across chunks (e.g. Experience spanning pages) are concatenated in order.
+    """
+    merged = {}
+    for parsed in parsed_chunks:
+        for title, content in split_sections(parsed):
+            key = title.lower()
+            if key in merged:
+                merged[key] = (merged[key][0], f"{merged[key][1]}\n{content}".strip())
+            else:
+                merged[key] = (title, content)
+    return "".join(f"=== {title} ===\n{content}\n\n" for title, content in merged.values()).strip()
+
 def parse_sections_with_llm(resume_text):
     """
     Parse unstructured resume text into structured sections using LLM.
     Supports custom or non-standard section detection.
+    Boilerplate is stripped first; resumes over RESUME_CHUNK_TOKENS are parsed in parallel chunks and merged.
     """
-    prompt = (
-        "You are an expert resume parser. Given the following unstructured resume text, extract and organize it into a clean structured format. "
-        "Detect all relevant sections, even if they are not standard (like Certifications, Projects, Publications, Languages, etc). "
-        "Return each section with a clear heading like this:\n\n"
-        "=== Section Name ===\n"
-        "Section content...\n\n"
-        "Make sure the output is complete and readable.\n\n"
-        f"Resume:\n{resume_text}"
-    )
-    return call_perplexity(prompt)
+    def build_prompt(text):
+        return (
+            "You are an expert resume parser. Given the following unstructured resume text, extract and organize it into a clean structured format. "
+            "Detect all relevant sections, even if they are not standard (like Certifications, Projects, Publications, Languages, etc). "
+            "Return each section with a clear heading like this:\n\n"
+            "=== Section Name ===\n"
+            "Section content...\n\n"
+            "Make sure the output is complete and readable.\n\n"
+            f"Resume:\n{text}"
+        )
+
+    chunks = chunk_text(clean_text(resume_text), RESUME_CHUNK_TOKENS)
+    if len(chunks) == 1:
+        return call_perplexity(build_prompt(chunks[0]))
+    return _merge_section_blocks(_map_prompts([build_prompt(chunk) for chunk in chunks]))
+
+def parse_resume_sections(resume_text, min_confidence=None):
+    """
+    Split a resume into "=== Section ===" blocks, locally when the headings are clear enough
+    and with parse_sections_with_llm otherwise.
+    """
+    if min_confidence is None:
+        min_confidence = SECTION_PARSER_MIN_CONFIDENCE
+    with metrics.timed("sections.local_parse") as fields:
+        structured, confidence = section_parser.parse_sections(clean_text(resume_text))
+        fields["confidence"] = confidence
+    if structured and confidence >= min_confidence:
+        metrics.increment("section_parser_local_total")
+        return structured
+    metrics.increment("section_parser_llm_fallback_total")
+    return parse_sections_with_llm(resume_text)
 
 # -----------------------------------------------
 # SECTION SCORING
@@ -280,49 +1061,471 @@ def score_section_with_llm(section_name, section_content):
         f"Evaluate the following '{section_name}' section of a resume. "
         "Score it from 1 to 10 based on clarity, impact, and relevance to a typical job description. "
         "Also give 1-2 sentences of constructive feedback.\n\n"
-        f"Section Content:\n{section_content}"
+        f"Section Content:\n{truncate_to_tokens(section_content, RESUME_CHUNK_TOKENS)}"
     )
     return call_perplexity(prompt)
 
-def score_all_sections(parsed_resume):
+def split_sections(parsed_resume):
+    """
+    Split an LLM-structured resume into (section name, content) pairs, in order.
+    """
+    return [(title, content) for title, content, _ in analyze_document(parsed_resume).sections]
+
+def _score_section_safely(section_name, section_content):
+    """
+    Score one section, turning any failure into a per-section error message
+    so a single bad call does not fail the whole batch.
+    """
+    try:
+        return score_section_with_llm(section_name, section_content)
+    except Exception as e:
+        return f"Error: could not score this section ({e})"
+
+def score_all_sections(parsed_resume, max_workers=None):
     """
     Apply scoring to each section in a structured resume.
-    Returns a dictionary of section names to score/feedback.
+    Sections are scored concurrently, at most `max_workers` at a time
+    (defaults to MAX_CONCURRENT_LLM_CALLS; use 1 for sequential scoring).
+    Returns a dictionary of section names to score/feedback, in section order.
     """
-    sections = re.findall(r'=== (.*?) ===\n(.*?)(?=(?:===|\Z))', parsed_resume, re.DOTALL)
+    sections = split_sections(parsed_resume)
+    if not sections:
+        return {}
+    max_workers = max(1, min(max_workers or MAX_CONCURRENT_LLM_CALLS, len(sections)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda sec: _score_section_safely(*sec), sections))
     section_scores = {}
-    for title, content in sections:
-        result = score_section_with_llm(title.strip(), content.strip())
-        section_scores[title.strip()] = result
+    for (title, _), result in zip(sections, results):
+        section_scores[title] = result
     return section_scores
 
-def regenerate_section_with_llm(section_name, current_content):
+def parse_score(feedback):
+    """
+    Pull an integer 1-10 score out of free-text LLM feedback such as "Score: **7/10**".
+    Returns None when no score can be found.
+    """
+    match = re.search(r"Score:\s*\*{0,2}(\d{1,2})\s*/\s*10", feedback) or re.search(r"(\d{1,2})\s*/\s*10", feedback)
+    if match and 0 <= int(match.group(1)) <= 10:
+        return int(match.group(1))
+    return None
+
+def _parse_batched_scores(raw, section_names):
+    """
+    Validate a batched scoring reply (a JSON array of {section, score, feedback}).
+    Returns the well-formed entries keyed by section name; anything else is dropped.
+    """
+    # Start at the first array of objects, so citation markers like "[1]" before it are skipped,
+    # and decode only that array, so markers after it are ignored
+    start = re.search(r"\[\s*\{", raw)
+    if start is None:
+        return {}
+    try:
+        items, _ = json.JSONDecoder().raw_decode(raw, start.start())
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    names_by_key = {name.lower(): name for name in section_names}
+    parsed = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name = names_by_key.get(str(item.get("section", "")).strip().lower())
+        score, feedback = item.get("score"), item.get("feedback")
+        if isinstance(score, str) and score.strip().isdigit():
+            score = int(score.strip())
+        if name is None or isinstance(score, bool) or not isinstance(score, int) or not 1 <= score <= 10:
+            continue
+        if not isinstance(feedback, str) or not feedback.strip():
+            continue
+        parsed[name] = {"score": score, "feedback": feedback.strip()}
+    return parsed
+
+def score_all_sections_batched(parsed_resume, max_workers=None):
+    """
+    Score every section of a structured resume with a single LLM call that returns JSON,
+    or, for long resumes, one call per group of sections under RESUME_CHUNK_TOKENS, run in parallel.
+    Sections missing from the reply or malformed in it are re-scored individually.
+    Returns a dictionary of section names to {"score": int or None, "feedback": str}, in section order.
+    """
+    sections = split_sections(parsed_resume)
+    if not sections:
+        return {}
+    section_names = [title for title, _ in sections]
+
+    # Pack sections, in order, into groups that fit RESUME_CHUNK_TOKENS; an oversized section is trimmed
+    groups, group, group_tokens = [], [], 0
+    for title, content in sections:
+        block = f"=== {title} ===\n{truncate_to_tokens(content, RESUME_CHUNK_TOKENS)}"
+        tokens = estimate_tokens(block)
+        if group and group_tokens + tokens > RESUME_CHUNK_TOKENS:
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append((title, block))
+        group_tokens += tokens
+    groups.append(group)
+
+    def score_group(group):
+        prompt = (
+            "Evaluate each of the following resume sections. "
+            "Score each from 1 to 10 based on clarity, impact, and relevance to a typical job description, "
+            "and give 1-2 sentences of constructive feedback.\n"
+            "Return only a JSON array with one object per section, in this exact form and with no other text:\n"
+            '[{"section": "<section name>", "score": <integer 1-10>, "feedback": "<feedback>"}]\n\n'
+            + "\n\n".join(block for _, block in group)
+        )
+        try:
+            return _parse_batched_scores(call_perplexity(prompt), [title for title, _ in group])
+        except Exception:
+            return {}
+
+    batched = {}
+    workers = max(1, min(max_workers or MAX_CONCURRENT_LLM_CALLS, len(groups)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for scored in executor.map(score_group, groups):
+            batched.update(scored)
+
+    missing = [(title, content) for title, content in sections if title not in batched]
+    if missing:
+        workers = max(1, min(max_workers or MAX_CONCURRENT_LLM_CALLS, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fallback = list(executor.map(lambda sec: _score_section_safely(*sec), missing))
+        for (title, _), feedback in zip(missing, fallback):
+            batched[title] = {"score": parse_score(feedback), "feedback": feedback}
+    return {title: batched[title] for title in section_names}
+
+def regenerate_section_with_llm(section_name, current_content, use_cache=False, on_delta=None, stats=None):
     """
     Regenerates a specific section of the resume using the LLM,
     improving clarity, formatting, and alignment with typical job expectations.
+    Bypasses the response cache by default so each click yields a fresh rewrite.
+    Pass `on_delta` to receive the rewrite as it streams in.
     """
     prompt = (
         f"You are an expert resume writer. Rewrite the '{section_name}' section below to improve clarity, impact, and alignment with industry best practices. "
         "Keep it concise and relevant. Return only the improved content without section headers or additional commentary.\n\n"
         f"{section_name} Section:\n{current_content}"
     )
-    return call_perplexity(prompt)
+    return _complete(prompt, use_cache=use_cache, on_delta=on_delta, stats=stats)
 # -----------------------------------------------
 # RESUME OPTIMIZATION
 # -----------------------------------------------
 
-def optimize_resume(resume_text, job_desc, skillset):
+def optimize_resume(resume_text, job_desc, skillset=None, on_delta=None, stats=None):
     """
-    Use LLM to tailor the resume based on the job description and detected skills.
+    Use LLM to tailor the resume based on the job description and detected skills
+    (by default the skillset stored in the job description's JDProfile).
+    Prompts are kept within budget: boilerplate is stripped, the job description and skill list
+    are trimmed, and resumes over RESUME_CHUNK_TOKENS are optimized in parallel chunks and merged.
+    Pass `on_delta` to receive the optimized text as it streams in (chunk by chunk for long resumes).
     Returns optimized text and skill overlap stats.
     """
-    prompt = (
-        "You are an expert resume optimizer. Given the following resume and job description, tailor the resume towards the job, "
-        "add important missing keywords and skills, and suggest ATS improvements. Highlight additions and changes.\n\n"
-        f"Relevant Skills: {', '.join(skillset)}\n\n"
-        f"Resume:\n{resume_text}\n\nJob Description:\n{job_desc}"
-    )
-    optimized_resume = call_perplexity(prompt)
-    resume_skills = extract_skills(resume_text.lower(), skillset)
-    jd_skills = extract_skills(job_desc.lower(), skillset)
+    profile = get_jd_profile(job_desc)
+    if skillset is None:
+        skillset = profile.skillset
+    jd_text = truncate_to_tokens(clean_text(job_desc), JD_TOKEN_BUDGET)
+    skills_text = budget_skills(skillset, SKILLS_TOKEN_BUDGET)
+    chunks = chunk_text(clean_text(resume_text), RESUME_CHUNK_TOKENS)
+
+    def build_prompt(text, part=None):
+        part_note = (
+            f"This is part {part} of {len(chunks)} of the resume; optimize only this part and return only its content.\n\n"
+            if part else ""
+        )
+        return (
+            "You are an expert resume optimizer. Given the following resume and job description, tailor the resume towards the job, "
+            "add important missing keywords and skills, and suggest ATS improvements. Highlight additions and changes.\n\n"
+            f"{part_note}"
+            f"Relevant Skills: {skills_text}\n\n"
+            f"Resume:\n{text}\n\nJob Description:\n{jd_text}"
+        )
+
+    if len(chunks) == 1:
+        optimized_resume = _complete(build_prompt(chunks[0]), on_delta=on_delta, stats=stats)
+    else:
+        start = time.perf_counter()
+        prompts = [build_prompt(chunk, part) for part, chunk in enumerate(chunks, 1)]
+        workers = max(1, min(MAX_CONCURRENT_LLM_CALLS, len(prompts)))
+        parts = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(call_perplexity, prompt) for prompt in prompts]:
+                parts.append(future.result())
+                if on_delta:
+                    if stats is not None and len(parts) == 1:
+                        stats["time_to_first_token"] = time.perf_counter() - start
+                    on_delta(parts[-1] if len(parts) == 1 else "\n\n" + parts[-1])
+        optimized_resume = "\n\n".join(parts)
+        if stats is not None:
+            stats["total_time"] = time.perf_counter() - start
+
+    resume_skills = extract_skills(resume_text, skillset)
+    jd_skills = profile.jd_skills(skillset)
     return optimized_resume, resume_skills, jd_skills
+
+# -----------------------------------------------
+# ANALYSIS PIPELINE
+# -----------------------------------------------
+
+def _run_timed_stage(name, fn, results):
+    with metrics.timed(f"stage.{name}"):
+        return fn(results)
+
+def run_stage_graph(stages, max_workers=None, on_stage_complete=None, poll=None, on_stage_result=None):
+    """
+    Run a small DAG of stages, starting every stage as soon as its dependencies finish.
+    `stages` maps a stage name to (dependency names, fn), where fn receives the dict of
+    results computed so far. `on_stage_complete(name, done, total)` is called from the
+    calling thread after each stage, so it is safe to update UI elements from it;
+    `on_stage_result(name, result)` likewise receives each stage's result as soon as it is ready.
+    `poll()`, if given, is also called from the calling thread every 0.1s while stages run.
+    Returns a dictionary of stage names to results; the first stage error is re-raised.
+    """
+    results = {}
+    pending = dict(stages)
+    running = {}
+    max_workers = max_workers or len(stages)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            ready = [name for name, (deps, _) in pending.items() if all(d in results for d in deps)]
+            for name in ready:
+                _, fn = pending.pop(name)
+                running[executor.submit(_run_timed_stage, name, fn, dict(results))] = name
+            if not running:
+                raise ValueError(f"Unresolvable stage dependencies: {', '.join(pending)}")
+
+            done, _ = wait(running, timeout=0.1 if poll else None, return_when=FIRST_COMPLETED)
+            if poll:
+                poll()
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                if on_stage_result:
+                    on_stage_result(name, results[name])
+                if on_stage_complete:
+                    on_stage_complete(name, len(results), len(stages))
+    return results
+
+def run_analysis_pipeline(resume_file, job_desc, on_stage_complete=None, on_optimize_delta=None, max_workers=None,
+                          on_stage_result=None, role=None):
+    """
+    Run the full resume analysis with independent stages in parallel, so total latency
+    follows the critical path (extract -> parse -> score, or skillset -> optimize)
+    rather than the sum of every LLM call.
+    `on_optimize_delta(text)` streams the optimized resume as it is generated and
+    `on_stage_result(name, result)` receives each stage's raw result; like
+    `on_stage_complete`, they are always called from the calling thread.
+    Job-side work comes from the job description's stored JDProfile, saved under `role` if given.
+    Returns the same fields app.py keeps in its session state.
+    """
+    deltas = queue.Queue()
+    optimize_stats = {}
+
+    def drain_deltas():
+        while not deltas.empty():
+            on_optimize_delta(deltas.get_nowait())
+
+    stages = {
+        "resume_text": ((), lambda r: extract_text(resume_file)),
+        "skillset": ((), lambda r: get_jd_profile(job_desc, role=role).skillset),
+        "ats": (("resume_text",), lambda r: ats_keyword_check(r["resume_text"], job_desc)),
+        "optimize": (("resume_text", "skillset"),
+                     lambda r: optimize_resume(r["resume_text"], job_desc, r["skillset"],
+                                               on_delta=deltas.put if on_optimize_delta else None,
+                                               stats=optimize_stats)),
+        "structured_resume": (("resume_text",), lambda r: parse_resume_sections(r["resume_text"])),
+        "section_scores": (("structured_resume",), lambda r: score_all_sections_batched(r["structured_resume"])),
+    }
+    results = run_stage_graph(stages, max_workers=max_workers, on_stage_complete=on_stage_complete,
+                              poll=drain_deltas if on_optimize_delta else None, on_stage_result=on_stage_result)
+    if on_optimize_delta:
+        drain_deltas()
+    optimized_resume, resume_skills, jd_skills = results["optimize"]
+    return {
+        "resume_text": results["resume_text"],
+        "ats": results["ats"],
+        "optimized_resume": optimized_resume,
+        "optimize_stats": optimize_stats,
+        "resume_skills": resume_skills,
+        "jd_skills": jd_skills,
+        "structured_resume": results["structured_resume"],
+        "section_scores": results["section_scores"]
+    }
+
+# -----------------------------------------------
+# INCREMENTAL SECTION RE-SCORING
+# -----------------------------------------------
+
+def _content_hash(text):
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+def _score_section_entry(section_name, section_content):
+    """
+    Score one section and return it in the {"score", "feedback"} form used by score_all_sections_batched.
+    """
+    feedback = _score_section_safely(section_name, section_content)
+    return {"score": parse_score(feedback), "feedback": feedback}
+
+class IncrementalScorer:
+    """
+    Re-scores only the sections whose content changed since they were last scored.
+    Edits are debounced: a section is sent to the LLM once its content has stayed the
+    same for `debounce` seconds, so a burst of edits costs a single call per section.
+    Scoring runs on background threads; call poll() to collect finished scores.
+    """
+
+    def __init__(self, debounce=2.0, max_workers=None):
+        self.debounce = debounce
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or MAX_CONCURRENT_LLM_CALLS)
+        self._lock = threading.Lock()
+        self._scored = {}    # section -> hash of the content its current score belongs to
+        self._changed = {}   # section -> (hash, content, time of last change)
+        self._running = {}   # section -> (hash, future)
+
+    def baseline(self, sections):
+        """
+        Mark the given {section: content} as already scored (e.g. by the initial analysis).
+        """
+        with self._lock:
+            self._scored = {name: _content_hash(content) for name, content in sections.items()}
+            self._changed.clear()
+
+    def update(self, sections):
+        """
+        Record the current {section: content}; changed sections are queued for re-scoring.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for name, content in sections.items():
+                content_hash = _content_hash(content)
+                running_hash = self._running.get(name, (None,))[0]
+                if content_hash == self._scored.get(name) and running_hash is None:
+                    self._changed.pop(name, None)
+                elif content_hash != running_hash and self._changed.get(name, (None,))[0] != content_hash:
+                    self._changed[name] = (content_hash, content, now)
+        self.tick()
+
+    def tick(self):
+        """
+        Submit sections whose debounce period has elapsed.
+        Returns True when finished scores are waiting to be collected with poll().
+        """
+        now = time.monotonic()
+        with self._lock:
+            for name, (content_hash, content, changed_at) in list(self._changed.items()):
+                if now - changed_at >= self.debounce and name not in self._running:
+                    self._running[name] = (content_hash, self._executor.submit(_score_section_entry, name, content))
+                    del self._changed[name]
+            return any(future.done() for _, future in self._running.values())
+
+    def poll(self):
+        """
+        Collect finished re-scores as {section: {"score", "feedback"}}.
+        Results for content that has since been edited again are dropped.
+        """
+        results = {}
+        with self._lock:
+            for name, (content_hash, future) in list(self._running.items()):
+                if not future.done():
+                    continue
+                del self._running[name]
+                if name in self._changed:
+                    continue
+                self._scored[name] = content_hash
+                results[name] = future.result()
+        return results
+
+    def is_pending(self, name):
+        """
+        True when the section has an edit waiting to be scored or being scored.
+        """
+        with self._lock:
+            return name in self._changed or name in self._running
+
+    def has_pending(self):
+        with self._lock:
+            return bool(self._changed or self._running)
+
+# -----------------------------------------------
+# SPECULATIVE SECTION REGENERATION
+# -----------------------------------------------
+
+# Opt-in prefetching of rewrites for low-scoring sections: sections scoring below the threshold are
+# regenerated in the background, at most PREFETCH_MAX_SECTIONS per analysis (the cost budget)
+PREFETCH_REGENERATION = os.getenv("PREFETCH_REGENERATION", "off").lower() in ("1", "true", "yes", "on")
+PREFETCH_SCORE_THRESHOLD = int(os.getenv("PREFETCH_SCORE_THRESHOLD", "6"))
+PREFETCH_MAX_SECTIONS = int(os.getenv("PREFETCH_MAX_SECTIONS", "3"))
+PREFETCH_MAX_WORKERS = int(os.getenv("PREFETCH_MAX_WORKERS", "2"))
+
+class SectionPrefetcher:
+    """
+    Regenerates low-scoring sections in the background before the user asks for it.
+    Rewrites are keyed by section name and content, so one is only handed out for the exact
+    content it was generated from; edited sections have their prefetched rewrites discarded.
+    """
+
+    def __init__(self, threshold=None, max_sections=None, max_workers=None):
+        self.threshold = PREFETCH_SCORE_THRESHOLD if threshold is None else threshold
+        self.max_sections = PREFETCH_MAX_SECTIONS if max_sections is None else max_sections
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or PREFETCH_MAX_WORKERS)
+        self._lock = threading.Lock()
+        self._prefetched = {}  # (section, content hash) -> future
+        self.spent = 0         # rewrites started, counted against max_sections
+
+    def prefetch(self, sections, section_scores):
+        """
+        Start background rewrites for the given {section: content} whose score in
+        `section_scores` ({section: {"score", "feedback"}}) is below the threshold, lowest first.
+        """
+        candidates = sorted(
+            (entry["score"], name) for name, entry in section_scores.items()
+            if name in sections and entry.get("score") is not None and entry["score"] < self.threshold
+        )
+        with self._lock:
+            for _, name in candidates:
+                key = (name, _content_hash(sections[name]))
+                if key in self._prefetched:
+                    continue
+                if self.spent >= self.max_sections:
+                    break
+                self._prefetched[key] = self._executor.submit(regenerate_section_with_llm, name, sections[name])
+                self.spent += 1
+                metrics.increment("prefetch_regenerations_total")
+
+    def discard_stale(self, sections):
+        """
+        Drop prefetched rewrites for sections whose current content differs from what they were generated from.
+        """
+        with self._lock:
+            for name, content_hash in list(self._prefetched):
+                if name in sections and _content_hash(sections[name]) != content_hash:
+                    self._prefetched.pop((name, content_hash)).cancel()
+
+    def take(self, name, content):
+        """
+        Return the prefetched rewrite for this section content, waiting if it is still being
+        generated, or None if there is none (or it failed). A rewrite is handed out only once.
+        """
+        with self._lock:
+            future = self._prefetched.pop((name, _content_hash(content)), None)
+        if future is None:
+            return None
+        try:
+            rewrite = future.result()
+        except Exception:
+            return None
+        metrics.increment("prefetch_regeneration_hits_total")
+        return rewrite
+
+    def is_ready(self, name, content):
+        """
+        True when a finished rewrite for this section content is waiting.
+        """
+        with self._lock:
+            future = self._prefetched.get((name, _content_hash(content)))
+        return future is not None and future.done() and future.exception() is None
@@ -0,0 +1,229 @@
+# Headless batch mode: score many resumes against many job descriptions from the command line
+#
+#   python batch.py --resumes resumes/ --jobs jobs/ --output results.jsonl --workers 8
+#
+# Inputs are directories (resumes: .pdf/.docx, job descriptions: .txt/.md) or manifest files
+# (.txt with one path per line, .csv or .jsonl with a "path" column/field and an optional "id").
+# Pairs already present in the output file are skipped, so an interrupted run can simply be restarted.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend import (
+    MAX_CONCURRENT_LLM_CALLS,
+    ats_keyword_check,
+    extract_skills,
+    extract_text,
+    get_jd_profile,
+    parse_resume_sections,
+    score_all_sections_batched
+)
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+JOB_EXTENSIONS = (".txt", ".md")
+CSV_FIELDS = [
+    "resume", "job", "ats_coverage_percent", "matching_keywords", "missing_keywords",
+    "resume_skills", "jd_skills", "skill_overlap", "skill_overlap_percent",
+    "section_scores", "average_section_score"
+]
+
+
+def load_inputs(path, extensions):
+    """
+    Return a list of (id, file path) pairs from a directory or a manifest file.
+    """
+    if os.path.isdir(path):
+        entries = []
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.lower().endswith(extensions):
+                    full_path = os.path.join(root, name)
+                    entries.append((os.path.relpath(full_path, path), full_path))
+        return sorted(entries)
+
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            records = list(csv.DictReader(f))
+        elif path.endswith(".jsonl"):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = [{"path": line.strip()} for line in f if line.strip() and not line.startswith("#")]
+    entries = []
+    for record in records:
+        file_path = os.path.join(base, record["path"])
+        entries.append((record.get("id") or record["path"], file_path))
+    return entries
+
+
+def load_completed_pairs(output):
+    """
+    Return the (resume, job) pairs already written to an existing output file.
+    """
+    if not os.path.exists(output):
+        return set()
+    with open(output, encoding="utf-8") as f:
+        if output.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        return {(row["resume"], row["job"]) for row in rows}
+
+
+class ResultWriter:
+    """
+    Append result rows to a JSONL or CSV file, flushing after every row so progress survives interruption.
+    """
+
+    def __init__(self, output):
+        self.is_csv = output.endswith(".csv")
+        write_header = self.is_csv and (not os.path.exists(output) or os.path.getsize(output) == 0)
+        self.file = open(output, "a", encoding="utf-8", newline="")
+        if self.is_csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            if write_header:
+                self.writer.writeheader()
+
+    def write(self, row):
+        if self.is_csv:
+            flat = dict(row)
+            for field in ("matching_keywords", "missing_keywords", "resume_skills", "jd_skills", "skill_overlap"):
+                flat[field] = "; ".join(row[field])
+            flat["section_scores"] = json.dumps(row["section_scores"])
+            self.writer.writerow(flat)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def analyze_resume(resume_id, resume_path, jobs, with_section_scores=True, max_pages=None):
+    """
+    Score one resume against every job in `jobs` ({job id: JDProfile}).
+    Resume-side work (extraction, section parsing and scoring) is done once and shared by all pairs.
+    Returns a list of result rows.
+    """
+    with open(resume_path, "rb") as f:
+        resume_text = extract_text(f, max_pages=max_pages)
+
+    section_scores = {}
+    if with_section_scores:
+        scored = score_all_sections_batched(parse_resume_sections(resume_text))
+        section_scores = {section: entry["score"] for section, entry in scored.items()}
+    scores = [score for score in section_scores.values() if score is not None]
+
+    rows = []
+    for job_id, profile in jobs.items():
+        ats = ats_keyword_check(resume_text, profile.job_desc)
+        resume_skills = extract_skills(resume_text, profile.skillset)
+        jd_skills = profile.jd_skills()
+        overlap = resume_skills & jd_skills
+        rows.append({
+            "resume": resume_id,
+            "job": job_id,
+            "ats_coverage_percent": ats["coverage_percent"],
+            "matching_keywords": sorted(ats["matching_keywords"]),
+            "missing_keywords": sorted(ats["missing_keywords"]),
+            "resume_skills": sorted(resume_skills),
+            "jd_skills": sorted(jd_skills),
+            "skill_overlap": sorted(overlap),
+            "skill_overlap_percent": round(len(overlap) / (len(jd_skills) or 1) * 100, 2),
+            "section_scores": section_scores,
+            "average_section_score": round(sum(scores) / len(scores), 2) if scores else None
+        })
+    return rows
+
+
+def run_batch(resumes, jobs, output, workers, with_section_scores=True, max_pages=None):
+    """
+    Score every resume against every job with a worker pool, skipping pairs already in `output`.
+    Returns (pairs written, failed resumes, elapsed seconds).
+    """
+    completed = load_completed_pairs(output)
+    job_ids = [job_id for job_id, _ in jobs]
+    pending = []
+    for resume_id, resume_path in resumes:
+        todo = [job_id for job_id in job_ids if (resume_id, job_id) not in completed]
+        if todo:
+            pending.append((resume_id, resume_path, todo))
+    total_pairs = sum(len(todo) for _, _, todo in pending)
+    print(f"{len(completed)} pairs already done, {total_pairs} to process", file=sys.stderr)
+    if not pending:
+        return 0, 0, 0.0
+
+    start = time.perf_counter()
+    needed_jobs = {job_id for _, _, todo in pending for job_id in todo}
+    job_descs = {}
+    for job_id, job_path in jobs:
+        if job_id in needed_jobs:
+            with open(job_path, encoding="utf-8") as f:
+                job_descs[job_id] = f.read()
+
+    # Job-side work (one skillset LLM call per new job description) is done once up front and stored
+    def load_profile(job_desc):
+        profile = get_jd_profile(job_desc)
+        profile.skillset  # fetched here so resume workers never wait on the LLM
+        return profile
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        profiles = dict(zip(job_descs, executor.map(load_profile, job_descs.values())))
+
+    writer = ResultWriter(output)
+    written, failed = 0, 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    analyze_resume, resume_id, resume_path,
+                    {job_id: profiles[job_id] for job_id in todo},
+                    with_section_scores, max_pages
+                ): resume_id
+                for resume_id, resume_path, todo in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"Failed to process {futures[future]}: {e}", file=sys.stderr)
+                    continue
+                for row in rows:
+                    writer.write(row)
+                written += len(rows)
+                elapsed = time.perf_counter() - start
+                print(f"{written}/{total_pairs} pairs ({written / elapsed * 60:.1f} pairs/min)", file=sys.stderr)
+    finally:
+        writer.close()
+    return written, failed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score many resumes against many job descriptions.")
+    parser.add_argument("--resumes", required=True, help="directory of .pdf/.docx resumes or a manifest file")
+    parser.add_argument("--jobs", required=True, help="directory of .txt/.md job descriptions or a manifest file")
+    parser.add_argument("--output", required=True, help="results file (.jsonl or .csv); existing pairs are skipped")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENT_LLM_CALLS, help="resumes processed in parallel")
+    parser.add_argument("--no-section-scores", action="store_true", help="skip LLM section parsing and scoring")
+    parser.add_argument("--max-pages", type=int, help="only read the first N pages of each PDF resume")
+    args = parser.parse_args()
+
+    resumes = load_inputs(args.resumes, RESUME_EXTENSIONS)
+    jobs = load_inputs(args.jobs, JOB_EXTENSIONS)
+    written, failed, elapsed = run_batch(
+        resumes, jobs, args.output, max(1, args.workers),
+        with_section_scores=not args.no_section_scores, max_pages=args.max_pages
+    )
+    rate = written / elapsed * 60 if elapsed else 0.0
+    print(f"Wrote {written} pairs in {elapsed:.1f}s ({rate:.1f} pairs/min), {failed} resumes failed", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Cold-start benchmark: time `import backend` in fresh interpreters and enforce a startup budget
+import argparse
+import statistics
+import subprocess
+import sys
+
+from common import REPO_ROOT, record_result
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import backend; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def measure_import(runs):
+    """
+    Import backend in `runs` fresh Python processes and return the import times in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of backend.py.")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters to time")
+    parser.add_argument("--budget", type=float, default=1.0, help="maximum allowed median import time in seconds")
+    parser.add_argument("--output", help="append the JSON result line to this file")
+    args = parser.parse_args()
+
+    timings = measure_import(args.runs)
+    median = statistics.median(timings)
+    record_result("import_backend", {
+        "runs": args.runs,
+        "median_s": round(median, 4),
+        "min_s": round(min(timings), 4),
+        "max_s": round(max(timings), 4),
+        "budget_s": args.budget,
+        "within_budget": median <= args.budget
+    }, args.output)
+    if median > args.budget:
+        sys.exit(f"backend import took {median:.3f}s, over the {args.budget:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# PDF export benchmark: pages rendered per second by export_to_pdf for 1-, 5- and 20-page inputs
+import argparse
+import random
+import time
+
+import PyPDF2
+
+from common import record_result
+
+import backend
+
+WORDS = (
+    "Led **cross-functional** team delivering scalable microservices, reduced latency by 40% "
+    "and mentored engineers across regions while owning the **quarterly roadmap** for analytics"
+).split()
+
+
+def make_document(pages, seed=0):
+    """
+    Build resume-like text with bold markup that renders to roughly `pages` PDF pages.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(pages * 50):
+        if i % 12 == 0:
+            lines.append(f"=== Section {i // 12} ===")
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 18))))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure export_to_pdf throughput in pages per second.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20], help="target document sizes in pages")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="append the JSON result lines to this file")
+    args = parser.parse_args()
+
+    for target in args.pages:
+        text = make_document(target)
+        page_count = len(PyPDF2.PdfReader(backend.export_to_pdf(text)).pages)
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            backend.export_to_pdf(text)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        record_result("export_to_pdf", {
+            "target_pages": target,
+            "pages": page_count,
+            "best_s": round(best, 5),
+            "pages_per_s": round(page_count / best, 1)
+        }, args.output)
+
+
+if __name__ == "__main__":
+    main()
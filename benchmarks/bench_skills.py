@@ -0,0 +1,83 @@
+# Skill extraction benchmark: compiled SkillIndex vs. the previous full spaCy parse on long resumes
+import argparse
+import random
+import time
+
+from common import record_result
+
+import backend
+
+SKILLS = [
+    "python", "java", "sql", "docker", "kubernetes", "aws", "machine learning", "deep learning",
+    "ci/cd", "data analysis", "project management", "communication", "leadership", "react",
+    "node.js", "natural language processing", "tensorflow", "pytorch", "git", "agile"
+]
+FILLER = (
+    "designed built delivered improved team customers platform services reporting pipelines "
+    "stakeholders migrated reduced latency across regions mentoring engineers quarterly roadmap"
+).split()
+
+
+def make_resume(words, seed=0):
+    """
+    Build a synthetic resume of roughly `words` words with skills sprinkled through filler text.
+    """
+    rng = random.Random(seed)
+    parts = []
+    while len(parts) < words:
+        parts.append(rng.choice(SKILLS) if rng.random() < 0.05 else rng.choice(FILLER))
+        if rng.random() < 0.08:
+            parts[-1] += "."
+    return " ".join(parts)
+
+
+def legacy_extract_skills(text, skillset):
+    """
+    The original implementation: full spaCy pipeline, single-token matches only.
+    """
+    doc = backend.get_nlp()(text)
+    return set(token.text.lower() for token in doc if token.text.lower() in skillset)
+
+
+def best_time(fn, repeats):
+    """
+    Return the fastest wall time over `repeats` calls of fn.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare skill extraction implementations on long resumes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 10000, 100000], help="resume sizes in words")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="append the JSON result lines to this file")
+    args = parser.parse_args()
+
+    skillset = set(SKILLS)
+    # Warm up model loading and index compilation so only matching is timed
+    legacy_extract_skills("warm up", skillset)
+    backend.extract_skills("warm up", skillset)
+
+    for size in args.sizes:
+        text = make_resume(size).lower()
+        legacy_s = best_time(lambda: legacy_extract_skills(text, skillset), args.repeats)
+        # Clear the shared document cache so tokenization is timed too, as on a first analysis
+        indexed_s = best_time(lambda: (backend._document_cache.clear(), backend.extract_skills(text, skillset)),
+                              args.repeats)
+        record_result("extract_skills", {
+            "words": size,
+            "legacy_s": round(legacy_s, 5),
+            "indexed_s": round(indexed_s, 5),
+            "speedup": round(legacy_s / indexed_s, 2) if indexed_s else None,
+            "legacy_matches": len(legacy_extract_skills(text, skillset)),
+            "indexed_matches": len(backend.extract_skills(text, skillset))
+        }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# Shared helpers for the benchmark scripts: repo import path and a comparable JSON-lines result format
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def record_result(benchmark, metrics, output=None):
+    """
+    Print one benchmark result as a JSON line and optionally append it to `output`,
+    so results from different runs and machines can be compared line by line.
+    """
+    result = {
+        "benchmark": benchmark,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **metrics
+    }
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    return result
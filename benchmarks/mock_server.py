@@ -0,0 +1,161 @@
+# Local stand-in for the Perplexity chat-completions API, for offline benchmarks and load tests
+#
+#   python benchmarks/mock_server.py --port 8765 --latency 0.3 --error-rate 0.05
+#   PERPLEXITY_API_URL=http://127.0.0.1:8765/chat/completions PERPLEXITY_API_KEY=mock streamlit run app.py
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SKILLS = (
+    "python, sql, machine learning, data analysis, docker, kubernetes, aws, ci/cd, communication, "
+    "leadership, project management, react, git, agile, tensorflow"
+)
+SECTIONS = {
+    "Summary": "Data engineer with 6 years of experience building analytics platforms.",
+    "Experience": "Senior Data Engineer, Acme Corp (2020-2024)\n- Built streaming pipelines in Python and Kafka\n"
+                  "- Reduced warehouse costs by 30%",
+    "Education": "B.Sc. Computer Science, State University",
+    "Skills": "Python, SQL, Docker, Kubernetes, AWS",
+    "Projects": "Open-source contributor to a workflow scheduler",
+}
+FILLER = (
+    "Results-driven engineer who designed and delivered scalable data platforms, partnered with stakeholders, "
+    "and improved reliability across services while mentoring a growing team."
+).split()
+
+
+def canned_reply(prompt):
+    """
+    Pick a realistic canned completion for a prompt built by backend.py.
+    """
+    if "comma-separated list of skill names" in prompt:
+        return SKILLS
+    if "expert resume parser" in prompt:
+        return "\n\n".join(f"=== {name} ===\n{content}" for name, content in SECTIONS.items())
+    if "Return only a JSON array" in prompt:
+        names = re.findall(r"^=== (.*?) ===$", prompt, re.MULTILINE)
+        return json.dumps([
+            {"section": name, "score": 5 + i % 5, "feedback": f"Solid {name.lower()} section; add measurable impact."}
+            for i, name in enumerate(names)
+        ])
+    if prompt.startswith("Evaluate the following"):
+        return "Score: 7/10\nClear and relevant; quantify achievements to strengthen impact."
+    return " ".join(FILLER[i % len(FILLER)] for i in range(200))
+
+
+class MockState:
+    """
+    Server behaviour: base latency (seconds), random jitter, error rate and per-token stream delay.
+    """
+
+    def __init__(self, latency=0.2, jitter=0.05, error_rate=0.0, token_delay=0.005, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_delay = token_delay
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        state = self.state
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with state.lock:
+            state.requests += 1
+            fail = state.random.random() < state.error_rate
+            delay = max(0.0, state.latency + state.random.uniform(-state.jitter, state.jitter))
+            if fail:
+                state.errors += 1
+        time.sleep(delay)
+        if fail:
+            self._send_json(503, {"error": "mock overload"}, {"Retry-After": "0"})
+            return
+
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        reply = canned_reply(prompt)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(reply) // 4,
+                 "total_tokens": (len(prompt) + len(reply)) // 4}
+        if not request.get("stream"):
+            self._send_json(200, {
+                "model": request.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}}],
+                "usage": usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = re.findall(r"\S+\s*|\s+", reply)
+        for i, token in enumerate(tokens):
+            event = {"choices": [{"index": 0, "delta": {"content": token}}]}
+            if i == len(tokens) - 1:
+                event["usage"] = usage
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+            time.sleep(state.token_delay)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_mock_server(port=0, **state_options):
+    """
+    Start the mock API on a background thread.
+    Returns (server, url, state); call server.shutdown() to stop it.
+    """
+    handler = type("BoundMockHandler", (MockHandler,), {"state": MockState(**state_options)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/chat/completions"
+    return server, url, handler.state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock chat-completions API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="uniform latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="delay between streamed tokens")
+    args = parser.parse_args()
+
+    server, url, _ = start_mock_server(args.port, latency=args.latency, jitter=args.jitter,
+                                       error_rate=args.error_rate, token_delay=args.token_delay)
+    print(f"Mock Perplexity API listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
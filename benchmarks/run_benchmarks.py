@@ -0,0 +1,163 @@
+# Offline benchmark suite: runs the backend against the local mock API and records comparable JSON-lines results
+#
+#   python benchmarks/run_benchmarks.py --latency 0.3 --output bench_output.jsonl
+import argparse
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+
+from common import record_result
+from mock_server import FILLER, SECTIONS, start_mock_server
+
+JOB_DESCRIPTION = (
+    "We are hiring a Senior Data Engineer to design and operate streaming pipelines in Python and SQL, "
+    "deploy services with Docker and Kubernetes on AWS, and collaborate with analysts on machine learning features."
+)
+
+
+class NamedBytes(BytesIO):
+    """
+    In-memory file with a name, standing in for a Streamlit upload.
+    """
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def make_resume_text(repeat):
+    """
+    Build structured resume text; `repeat` scales the Experience section to lengthen the resume.
+    """
+    sections = dict(SECTIONS)
+    sections["Experience"] = "\n".join(
+        f"- {' '.join(FILLER[(i + j) % len(FILLER)] for j in range(16))}" for i in range(repeat * 8)
+    )
+    return "\n\n".join(f"=== {name} ===\n{content}" for name, content in sections.items())
+
+
+def make_samples(backend):
+    """
+    Return sample resumes as (label, text, [uploaded-file-like objects]) in PDF and DOCX form.
+    """
+    samples = []
+    for label, repeat in (("short", 1), ("medium", 5), ("long", 25)):
+        text = make_resume_text(repeat)
+        pdf = backend.export_to_pdf(text).getvalue()
+        docx_bytes = backend.export_to_docx(text).getvalue()
+        samples.append((label, text, [NamedBytes(pdf, f"{label}.pdf"), NamedBytes(docx_bytes, f"{label}.docx")]))
+    return samples
+
+
+def timings_summary(timings):
+    return {
+        "runs": len(timings),
+        "median_s": round(statistics.median(timings), 5),
+        "min_s": round(min(timings), 5),
+        "max_s": round(max(timings), 5)
+    }
+
+
+def time_calls(fn, repeats, before=None):
+    timings = []
+    for _ in range(repeats):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_extraction(backend, samples, repeats, output):
+    for label, _, files in samples:
+        for upload in files:
+            timings = time_calls(lambda: backend.extract_text(upload), repeats, before=backend._extraction_cache.clear)
+            record_result("extract_text", {"sample": label, "format": upload.name.rsplit(".", 1)[1],
+                                           **timings_summary(timings)}, output)
+
+
+def bench_exports(backend, samples, repeats, output):
+    for label, text, _ in samples:
+        for fmt, exporter in (("pdf", backend.export_to_pdf), ("docx", backend.export_to_docx)):
+            timings = time_calls(lambda: exporter(text), repeats)
+            record_result("export", {"sample": label, "format": fmt, **timings_summary(timings)}, output)
+
+
+def bench_scoring(backend, samples, repeats, output):
+    structured = samples[0][1]
+    section_count = len(backend.split_sections(structured))
+    modes = {
+        "sequential": lambda: backend.score_all_sections(structured, max_workers=1),
+        "concurrent": lambda: backend.score_all_sections(structured),
+        "batched": lambda: backend.score_all_sections_batched(structured),
+    }
+    for mode, fn in modes.items():
+        timings = time_calls(fn, repeats)
+        record_result("score_all_sections", {
+            "mode": mode,
+            "sections": section_count,
+            "sections_per_s": round(section_count / statistics.median(timings), 2),
+            **timings_summary(timings)
+        }, output)
+
+
+def bench_pipeline(backend, samples, repeats, output):
+    for label, _, files in samples:
+        upload = files[0]
+        # Forget stored job description profiles so every run includes the skillset stage
+        timings = time_calls(lambda: backend.run_analysis_pipeline(upload, JOB_DESCRIPTION), repeats,
+                             before=backend._jd_profiles.clear)
+        record_result("analysis_pipeline", {"sample": label, **timings_summary(timings)}, output)
+
+
+BENCHMARKS = {
+    "extraction": bench_extraction,
+    "export": bench_exports,
+    "scoring": bench_scoring,
+    "pipeline": bench_pipeline,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline against a local mock LLM API.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock API base latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock requests failing with 503")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="mock delay between streamed tokens")
+    parser.add_argument("--output", help="append the JSON result lines to this file")
+    args = parser.parse_args()
+
+    server, url, state = start_mock_server(latency=args.latency, error_rate=args.error_rate,
+                                           token_delay=args.token_delay)
+    # The backend reads its API settings at import time, so point it at the mock first
+    os.environ.update({
+        "PERPLEXITY_API_URL": url,
+        "PERPLEXITY_API_KEY": "mock",
+        "RESUME_REFINER_CACHE_PATH": "off",
+        "RESUME_REFINER_JD_PROFILES_PATH": "off",
+        "LLM_REQUESTS_PER_SECOND": "0",
+    })
+    import backend
+    import metrics
+
+    samples = make_samples(backend)
+    try:
+        for name in args.only or BENCHMARKS:
+            BENCHMARKS[name](backend, samples, args.repeats, args.output)
+    finally:
+        server.shutdown()
+
+    for stage, stats in metrics.summary().items():
+        record_result("stage_metrics", {
+            "stage": stage, "count": stats["count"], "errors": stats["errors"],
+            "p50_s": round(stats["p50"], 5), "p95_s": round(stats["p95"], 5)
+        }, args.output)
+    print(f"Mock API served {state.requests} requests ({state.errors} injected errors)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Persistent store of job description profiles (skillset and keyword frequencies), stored in a local SQLite file
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class JDProfileStore:
+    """
+    On-disk job description profiles keyed by a hash of the job description text,
+    optionally also reachable by a saved role name.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            "key TEXT PRIMARY KEY, role TEXT, job_desc TEXT NOT NULL, skillset TEXT, keyword_counts TEXT NOT NULL, "
+            "created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_role ON profiles (role)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(job_desc):
+        """
+        Build the profile key for a job description.
+        """
+        return hashlib.sha256(job_desc.strip().encode("utf-8")).hexdigest()
+
+    def _row_to_profile(self, row):
+        if row is None:
+            return None
+        key, role, job_desc, skillset, keyword_counts = row
+        return {
+            "key": key,
+            "role": role,
+            "job_desc": job_desc,
+            "skillset": None if skillset is None else json.loads(skillset),
+            "keyword_counts": json.loads(keyword_counts)
+        }
+
+    def get(self, key):
+        """
+        Return the stored profile dict for `key`, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, role, job_desc, skillset, keyword_counts FROM profiles WHERE key = ?", (key,)
+            ).fetchone()
+        return self._row_to_profile(row)
+
+    def get_by_role(self, role):
+        """
+        Return the most recently saved profile for a role name (case-insensitive), or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, role, job_desc, skillset, keyword_counts FROM profiles "
+                "WHERE lower(role) = lower(?) ORDER BY updated DESC LIMIT 1", (role.strip(),)
+            ).fetchone()
+        return self._row_to_profile(row)
+
+    def put(self, key, job_desc, keyword_counts, skillset=None, role=None):
+        """
+        Insert or update a profile. A missing skillset or role keeps the stored value.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO profiles (key, role, job_desc, skillset, keyword_counts, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "role = COALESCE(excluded.role, role), skillset = COALESCE(excluded.skillset, skillset), "
+                "keyword_counts = excluded.keyword_counts, updated = excluded.updated",
+                (key, role, job_desc, None if skillset is None else json.dumps(sorted(skillset)),
+                 json.dumps(keyword_counts), now, now)
+            )
+            self._conn.commit()
+
+    def roles(self):
+        """
+        Return the saved role names, most recently updated first.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role FROM profiles WHERE role IS NOT NULL GROUP BY lower(role) ORDER BY MAX(updated) DESC"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, key):
+        """
+        Remove one profile.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM profiles WHERE key = ?", (key,))
+            self._conn.commit()
@@ -0,0 +1,142 @@
+# Shared HTTP client for the LLM API: pooled keep-alive connections, retries with backoff and rate limiting
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# HTTP statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `rate` requests per second on average,
+    with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a token is available, then consume it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def _retry_after_seconds(response):
+    """
+    Parse a Retry-After header (delta seconds or HTTP date) into seconds, or None.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMClient:
+    """
+    Pooled client for a chat-completions endpoint.
+    Reuses keep-alive connections across calls and threads, retries throttled,
+    failed or timed-out requests with jittered exponential backoff (honoring Retry-After),
+    and limits request rate across every caller sharing the client.
+    """
+
+    def __init__(self, url, api_key, timeout=60, max_retries=4, backoff_base=1.0, backoff_max=30.0,
+                 requests_per_second=2.0, pool_size=10):
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt, response=None):
+        """
+        Seconds to wait before the next attempt: Retry-After when given, else full-jitter exponential backoff.
+        """
+        retry_after = _retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, payload, stream=False):
+        """
+        POST a chat-completions payload and return the successful response,
+        with the number of retries it took stored on `response.retries`.
+        Raises the last error once retries are exhausted.
+        """
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.post(self.url, headers=headers, json=payload,
+                                             timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._backoff(attempt, response)
+                response.close()
+                time.sleep(delay)
+                continue
+            response.raise_for_status()
+            response.retries = attempt
+            return response
+
+
+def iter_sse_events(response):
+    """
+    Yield decoded JSON payloads from a chat-completions server-sent event stream
+    until the terminating [DONE] event. The body is read to the end so the
+    connection goes back to the pool instead of being dropped.
+    """
+    done = False
+    try:
+        for raw_line in response.iter_lines():
+            line = raw_line.decode("utf-8")
+            if done or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                done = True
+                continue
+            yield json.loads(data)
+    finally:
+        response.close()
@@ -0,0 +1,144 @@
+# Lightweight in-process instrumentation: per-stage timings, counters, JSON log lines and Prometheus text output
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Number of most recent samples kept per stage for percentile estimates
+MAX_SAMPLES = 1000
+
+logger = logging.getLogger("resume_refiner.metrics")
+if os.getenv("RESUME_REFINER_METRICS_LOG"):
+    # One JSON object per line, e.g. RESUME_REFINER_METRICS_LOG=metrics.jsonl
+    _handler = logging.FileHandler(os.getenv("RESUME_REFINER_METRICS_LOG"), encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_totals = defaultdict(lambda: {"count": 0, "sum": 0.0, "errors": 0})
+_counters = defaultdict(float)
+
+
+def observe(stage, seconds, error=False, **fields):
+    """
+    Record one timed occurrence of `stage` and emit it as a structured JSON log line.
+    Extra keyword fields (sizes, token usage, cache hits...) are included in the log line.
+    """
+    with _lock:
+        _samples[stage].append(seconds)
+        totals = _totals[stage]
+        totals["count"] += 1
+        totals["sum"] += seconds
+        totals["errors"] += int(error)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"ts": time.time(), "stage": stage, "seconds": round(seconds, 6),
+                                "error": error, **fields}, default=str))
+
+
+@contextmanager
+def timed(stage, **fields):
+    """
+    Time the enclosed block as `stage`. Yields a dict the block can add log fields to.
+    """
+    extra = dict(fields)
+    start = time.perf_counter()
+    error = False
+    try:
+        yield extra
+    except BaseException:
+        error = True
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start, error=error, **extra)
+
+
+def increment(counter, value=1):
+    """
+    Add `value` to a monotonically increasing counter.
+    """
+    with _lock:
+        _counters[counter] += value
+
+
+def _percentile(sorted_values, fraction):
+    # Nearest-rank percentile
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summary():
+    """
+    Return {stage: {"count", "errors", "mean", "p50", "p95", "max"}} in seconds,
+    with percentiles over the most recent MAX_SAMPLES samples.
+    """
+    with _lock:
+        snapshot = {stage: (sorted(samples), dict(_totals[stage])) for stage, samples in _samples.items()}
+    result = {}
+    for stage, (values, totals) in sorted(snapshot.items()):
+        result[stage] = {
+            "count": totals["count"],
+            "errors": totals["errors"],
+            "mean": totals["sum"] / totals["count"],
+            "p50": _percentile(values, 0.5),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1]
+        }
+    return result
+
+
+def counters():
+    """
+    Return a copy of all counters.
+    """
+    with _lock:
+        return dict(_counters)
+
+
+def prometheus_text():
+    """
+    Render stage timings and counters in the Prometheus text exposition format.
+    """
+    lines = [
+        "# HELP resume_refiner_stage_seconds Wall time per pipeline stage or LLM call.",
+        "# TYPE resume_refiner_stage_seconds summary"
+    ]
+    with _lock:
+        totals = {stage: dict(values) for stage, values in _totals.items()}
+    for stage, stats in summary().items():
+        for quantile in ("0.5", "0.95"):
+            value = stats["p50"] if quantile == "0.5" else stats["p95"]
+            lines.append(f'resume_refiner_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {value:.6f}')
+        lines.append(f'resume_refiner_stage_seconds_sum{{stage="{stage}"}} {totals[stage]["sum"]:.6f}')
+        lines.append(f'resume_refiner_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    lines.append("# HELP resume_refiner_stage_errors_total Failed stage runs.")
+    lines.append("# TYPE resume_refiner_stage_errors_total counter")
+    for stage, stats in sorted(totals.items()):
+        lines.append(f'resume_refiner_stage_errors_total{{stage="{stage}"}} {stats["errors"]}')
+    for name, value in sorted(counters().items()):
+        lines.append(f"# TYPE resume_refiner_{name} counter")
+        lines.append(f"resume_refiner_{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """
+    Dump prometheus_text() to a file (e.g. for a node-exporter textfile collector).
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+
+
+def reset():
+    """
+    Clear all recorded timings and counters.
+    """
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _counters.clear()
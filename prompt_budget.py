@@ -0,0 +1,154 @@
+# Prompt budgeting: token estimates, boilerplate cleanup, trimming and chunking of long inputs
+import re
+
+# Rough characters-per-token ratio for English text with LLM tokenizers
+CHARS_PER_TOKEN = 4
+
+# Lines that carry no content for the LLM (stock phrases)
+BOILERPLATE_PATTERNS = [
+    re.compile(r"^references\s+(are\s+)?available\s+(up)?on\s+request\.?$", re.IGNORECASE),
+    re.compile(r"^curriculum\s+vitae$|^resume$|^résumé$", re.IGNORECASE),
+]
+
+# Page number footers/headers by style; a style only counts when its numbers run in sequence
+# across pages, so content lines such as "2016/2019" are never mistaken for page numbers
+PAGE_MARKER_PATTERNS = {
+    "page": re.compile(r"^page\s+(\d+)(?:\s*(?:of|/)\s*\d+)?$", re.IGNORECASE),
+    "fraction": re.compile(r"^(\d+)\s*(?:/|of)\s*\d+$", re.IGNORECASE),
+    "dashed": re.compile(r"^[-–—]\s*(\d+)\s*[-–—]$"),
+}
+
+# Lines within this many non-blank lines of a page's start or end count as its header/footer
+PAGE_EDGE_LINES = 3
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of LLM tokens in `text`.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _page_marker_lines(lines):
+    """
+    Return the indexes of lines that are page numbers: "Page N" footers, or "N / M" and
+    "- N -" footers counting up one per page.
+    """
+    markers = set()
+    for style, pattern in PAGE_MARKER_PATTERNS.items():
+        found = [(i, pattern.match(line)) for i, line in enumerate(lines)]
+        found = [(i, int(match.group(1))) for i, match in found if match]
+        numbers = [number for _, number in found]
+        consecutive = bool(numbers) and numbers == list(range(numbers[0], numbers[0] + len(numbers)))
+        if consecutive and (len(found) >= 2 or style == "page"):
+            markers.update(i for i, _ in found)
+    return markers
+
+
+def clean_text(text):
+    """
+    Drop stock phrases, page numbers and running headers/footers (lines repeated at the
+    edges of several pages), normalize whitespace and collapse runs of blank lines.
+    Pages are delimited by the detected page numbers; without them nothing is deduplicated,
+    and repeated lines elsewhere (e.g. a bullet used under two jobs) are always kept.
+    """
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines()]
+    markers = _page_marker_lines(lines)
+
+    # Group the remaining non-blank lines into pages and note which sit at a page edge
+    pages, page = [], []
+    for i, line in enumerate(lines):
+        if i in markers:
+            pages.append(page)
+            page = []
+        elif line:
+            page.append(i)
+    pages.append(page)
+    edge_page = {}
+    for number, page in enumerate(pages):
+        for position, i in enumerate(page):
+            if position < PAGE_EDGE_LINES or position >= len(page) - PAGE_EDGE_LINES:
+                edge_page[i] = number
+
+    # Lines seen at the edges of two or more pages are running headers/footers
+    edge_pages_by_line = {}
+    for i, number in edge_page.items():
+        edge_pages_by_line.setdefault(lines[i].lower(), set()).add(number)
+    running = {key for key, numbers in edge_pages_by_line.items() if len(numbers) > 1}
+
+    seen_running = set()
+    cleaned = []
+    for i, line in enumerate(lines):
+        if i in markers:
+            continue
+        if not line:
+            if cleaned and cleaned[-1]:
+                cleaned.append("")
+            continue
+        if any(pattern.match(line) for pattern in BOILERPLATE_PATTERNS):
+            continue
+        key = line.lower()
+        if key in running and i in edge_page:
+            if key in seen_running:
+                continue
+            seen_running.add(key)
+        cleaned.append(line)
+    return "\n".join(cleaned).strip()
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cut text to at most `max_tokens`, preferring a line boundary.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[:cut if cut > max_chars // 2 else max_chars].rstrip()
+
+
+def chunk_text(text, max_tokens):
+    """
+    Split text into chunks of at most `max_tokens`, breaking between paragraphs,
+    then between lines, and only as a last resort inside a line.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    # (piece, separator placed before it when it shares a chunk with the previous piece)
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if len(paragraph) <= max_chars:
+            pieces.append((paragraph, "\n\n"))
+            continue
+        separator = "\n\n"
+        for line in paragraph.splitlines():
+            while len(line) > max_chars:
+                pieces.append((line[:max_chars], separator))
+                line, separator = line[max_chars:], ""
+            pieces.append((line, separator))
+            separator = "\n"
+
+    chunks, current = [], ""
+    for piece, separator in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def budget_skills(skillset, max_tokens):
+    """
+    Join skills into a comma-separated list that fits in `max_tokens`, shortest first.
+    """
+    joined = ""
+    for skill in sorted(set(skillset), key=lambda s: (len(s), s)):
+        candidate = f"{joined}, {skill}" if joined else skill
+        if estimate_tokens(candidate) > max_tokens:
+            break
+        joined = candidate
+    return joined
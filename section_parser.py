@@ -0,0 +1,167 @@
+# Deterministic resume section parser: finds headings from wording, capitalization and layout cues
+# and scores how confident the split is, so the LLM parser is only needed for unusual layouts
+import re
+
+# Canonical section names and the headings that map to them
+SECTION_ALIASES = {
+    "Summary": ["summary", "professional summary", "profile", "professional profile", "career summary",
+                "objective", "career objective", "about me", "about", "personal statement", "overview"],
+    "Experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience",
+                   "professional background", "internships", "internship experience"],
+    "Education": ["education", "academic background", "education and training", "academic qualifications",
+                  "qualifications", "academics"],
+    "Skills": ["skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "skills and abilities", "technologies", "tools", "areas of expertise", "expertise"],
+    "Projects": ["projects", "personal projects", "academic projects", "key projects", "selected projects"],
+    "Certifications": ["certifications", "certificates", "licenses", "licenses and certifications",
+                       "certifications and licenses", "courses", "training"],
+    "Publications": ["publications", "selected publications", "papers", "research papers"],
+    "Research": ["research", "research experience", "research interests"],
+    "Teaching": ["teaching", "teaching experience"],
+    "Awards": ["awards", "honors", "honours", "awards and honors", "achievements", "accomplishments"],
+    "Languages": ["languages", "language skills"],
+    "Volunteer Experience": ["volunteer", "volunteering", "volunteer experience", "community service"],
+    "Leadership": ["leadership", "leadership experience", "activities", "extracurricular activities",
+                   "extracurricular", "affiliations", "memberships", "professional memberships"],
+    "Interests": ["interests", "hobbies", "hobbies and interests"],
+    "References": ["references"],
+    "Contact": ["contact", "contact information", "contact details", "personal information", "personal details"],
+}
+_ALIAS_TO_SECTION = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Leading bullets/numbering and trailing colons or rules around a heading
+_DECORATION = re.compile(r"^[\s\-–—•*#>|=\d.)]*|[\s:\-–—|=_*]*$")
+_INLINE_HEADING = re.compile(r"^([A-Za-z &/]{3,40}?)\s*[:\-–—|]\s+(\S.*)$")
+_MAX_HEADING_WORDS = 5
+
+# Sections made of entries headed by organization names; all-caps lines inside them such as
+# "ACME CORP" are entry headers, not new sections
+_ENTRY_SECTIONS = {"Experience", "Education", "Projects", "Research", "Teaching", "Volunteer Experience", "Leadership"}
+
+# Below this overall confidence the split is considered unreliable
+DEFAULT_MIN_CONFIDENCE = 0.6
+
+
+def _normalize_heading(line):
+    text = _DECORATION.sub("", line).strip().lower()
+    return re.sub(r"\s+", " ", text.replace("&", "and"))
+
+
+def _heading_score(line, previous_blank):
+    """
+    Return (section name, confidence) if `line` looks like a section heading, else None.
+    Known headings score highest; unknown ones need strong layout cues (short, all caps, no sentence
+    punctuation, preceded by a blank line) so job titles inside a section are not split off.
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > 50:
+        return None
+    key = _normalize_heading(stripped)
+    words = key.split()
+    if not words or len(words) > _MAX_HEADING_WORDS:
+        return None
+
+    letters = [c for c in stripped if c.isalpha()]
+    all_caps = bool(letters) and all(c.isupper() for c in letters)
+    title_case = all(w[0].isupper() for w in stripped.split() if w[0].isalpha() and len(w) > 3)
+    layout = 0.1 * previous_blank + 0.1 * stripped.endswith(":") + 0.2 * all_caps + 0.1 * title_case
+
+    if key in _ALIAS_TO_SECTION:
+        return _ALIAS_TO_SECTION[key], min(1.0, 0.6 + layout)
+    if all_caps and previous_blank and len(words) <= 4 and not re.search(r"[\d@,.;()]", stripped):
+        return stripped.strip(":").strip().title(), min(1.0, 0.3 + layout)
+    return None
+
+
+def detect_sections(text):
+    """
+    Split resume text into sections.
+    Returns a list of (section name, content, confidence) in order; text before the first heading
+    (name and contact lines) becomes a "Contact" section. Known headings left without content
+    are kept with empty content so overall_confidence can penalize them.
+    """
+    sections = []
+    name, confidence, lines = "Contact", 0.5, []
+    from_heading = False
+    previous_blank = True
+
+    def close():
+        content = "\n".join(lines).strip()
+        if content or (from_heading and name in SECTION_ALIASES):
+            sections.append((name, content, confidence))
+
+    for line in text.splitlines():
+        heading = _heading_score(line, previous_blank)
+        inline = None if heading else _INLINE_HEADING.match(line.strip())
+        # An unknown all-caps "heading" right under a known heading, or inside an entry section,
+        # is an employer or title line ("ACME CORP") rather than a new section
+        absorbs_unknown = from_heading and name in SECTION_ALIASES and (
+            name in _ENTRY_SECTIONS or not any(l.strip() for l in lines))
+        if inline and _normalize_heading(inline.group(1)) in _ALIAS_TO_SECTION:
+            # "Skills: Python, SQL" – heading and first content line on one line
+            close()
+            name, confidence = _ALIAS_TO_SECTION[_normalize_heading(inline.group(1))], 0.7
+            lines, from_heading = [inline.group(2)], True
+        elif heading and not (absorbs_unknown and heading[0] not in SECTION_ALIASES):
+            close()
+            (name, confidence), lines, from_heading = heading, [], True
+        else:
+            lines.append(line.rstrip())
+        previous_blank = not line.strip()
+    close()
+    return _merge_repeated(sections)
+
+
+def _merge_repeated(sections):
+    """
+    Merge sections with the same name (e.g. Experience continued on a later page), keeping first position.
+    """
+    merged = {}
+    for name, content, confidence in sections:
+        if name not in merged:
+            merged[name] = (name, content, confidence)
+            continue
+        _, previous, previous_confidence = merged[name]
+        if not previous or not content:
+            # An empty heading repeated next to a filled one does not lower the filled one's confidence
+            merged[name] = (name, previous or content, confidence if not previous else previous_confidence)
+        else:
+            merged[name] = (name, f"{previous}\n{content}", min(previous_confidence, confidence))
+    return list(merged.values())
+
+
+def overall_confidence(sections):
+    """
+    Combine per-heading confidence with document-level cues into a 0-1 score:
+    how many standard sections were found and how much of the text sits under a real heading.
+    Known headings that ended up empty lower the score, since their content was likely split off.
+    """
+    headed = [s for s in sections if s[0] != "Contact" or s[2] > 0.5]
+    if not headed:
+        return 0.0
+    known = sum(1 for name, content, _ in headed if name in SECTION_ALIASES and content)
+    empty = sum(1 for _, content, _ in headed if not content)
+    heading_quality = sum(confidence for _, _, confidence in headed) / len(headed)
+    total = sum(len(content) for _, content, _ in sections) or 1
+    preamble = sum(len(content) for name, content, confidence in sections if name == "Contact" and confidence <= 0.5)
+    coverage = 1 - preamble / total
+    # A lot of unknown "headings" usually means job titles or company names were mistaken for sections
+    noise = max(0.0, (len(headed) - known - empty) / len(headed) - 0.34)
+    score = 0.4 * min(1.0, known / 3) + 0.3 * heading_quality + 0.3 * coverage - noise - 0.25 * empty
+    return round(max(0.0, score), 3)
+
+
+def format_sections(sections):
+    """
+    Render sections in the "=== Section Name ===" format produced by the LLM parser.
+    """
+    return "".join(f"=== {name} ===\n{content}\n\n" for name, content, _ in sections if content).strip()
+
+
+def parse_sections(text):
+    """
+    Parse resume text locally. Returns (structured text, overall confidence).
+    """
+    sections = detect_sections(text)
+    return format_sections(sections), overall_confidence(sections)
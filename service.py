@@ -0,0 +1,290 @@
+# Headless analysis service: a job queue and worker pool around the backend pipeline, served over HTTP
+#
+#   python service.py --port 8600 --workers 4
+#
+# Endpoints:
+#   POST /jobs               {"filename": "cv.pdf", "file_b64": "...", "job_desc": "..."} -> {"job_id": ...}
+#   GET  /jobs/<id>          job status, stage-by-stage results so far and the final result
+#   GET  /jobs/<id>/events   server-sent events, one per finished stage, until the job ends
+#   GET  /metrics            Prometheus text metrics
+#   GET  /healthz            liveness check
+#
+# Job ids are derived from the resume bytes and job description, so resubmitting the same
+# analysis (e.g. after a browser refresh) reattaches to the existing job instead of redoing LLM calls.
+import argparse
+import base64
+import hashlib
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import requests
+
+import metrics
+from backend import run_analysis_pipeline
+
+# Finished jobs are kept this long (seconds) so clients can reconnect and fetch results
+JOB_RETENTION_SECONDS = 24 * 3600
+
+
+class UploadedResume(BytesIO):
+    """
+    In-memory resume file with a name, as extract_text expects from an upload.
+    """
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def _jsonable(value):
+    """
+    Convert pipeline results (sets, tuples) into JSON-serializable structures.
+    """
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    return value
+
+
+class Job:
+    """
+    One queued analysis and everything known about it so far.
+    """
+
+    def __init__(self, job_id, filename, data, job_desc):
+        self.id = job_id
+        self.filename = filename
+        self.data = data
+        self.job_desc = job_desc
+        self.status = "queued"
+        self.stages = {}
+        self.result = None
+        self.error = None
+        self.created = self.updated = time.time()
+        self.changed = threading.Condition()
+
+    def to_dict(self):
+        with self.changed:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "stages": dict(self.stages),
+                "result": self.result,
+                "error": self.error,
+                "created": self.created,
+                "updated": self.updated
+            }
+
+    def update(self, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.updated = time.time()
+            self.changed.notify_all()
+
+
+class JobQueue:
+    """
+    In-process job store, queue and worker pool.
+    """
+
+    def __init__(self, workers=4):
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"analysis-worker-{i}", daemon=True).start()
+
+    def submit(self, filename, data, job_desc):
+        """
+        Queue an analysis and return its Job. An identical, not-failed job is reused.
+        """
+        digest = hashlib.sha256()
+        for part in (filename.rsplit(".", 1)[-1].lower().encode("utf-8"), data, job_desc.encode("utf-8")):
+            digest.update(hashlib.sha256(part).digest())
+        job_id = digest.hexdigest()[:32]
+        with self.lock:
+            self._expire()
+            job = self.jobs.get(job_id)
+            if job is not None and job.status != "failed":
+                return job
+            job = self.jobs[job_id] = Job(job_id, filename, data, job_desc)
+        metrics.increment("service_jobs_submitted_total")
+        self.queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _expire(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [j.id for j in self.jobs.values() if j.status in ("done", "failed") and j.updated < cutoff]:
+            del self.jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            job.update(status="running")
+
+            def record_stage(name, result):
+                with job.changed:
+                    job.stages[name] = _jsonable(result)
+                job.update()
+
+            try:
+                with metrics.timed("service.job"):
+                    result = run_analysis_pipeline(UploadedResume(job.data, job.filename), job.job_desc,
+                                                   on_stage_result=record_stage)
+                job.update(status="done", result=_jsonable(result), data=None)
+            except Exception as e:
+                job.update(status="failed", error=str(e), data=None)
+            finally:
+                self.queue.task_done()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    jobs = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        payload = body if isinstance(body, bytes) else (
+            body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8"))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            filename, job_desc = request["filename"], request["job_desc"]
+            data = base64.b64decode(request["file_b64"])
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"invalid request: {e}"})
+            return
+        if not filename.lower().endswith((".pdf", ".docx")) or not job_desc.strip():
+            self._send(400, {"error": "a .pdf or .docx resume and a job description are required"})
+            return
+        job = self.jobs.submit(filename, data, job_desc)
+        self._send(202, {"job_id": job.id, "status": job.status})
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if parts == ["healthz"]:
+            self._send(200, {"status": "ok"})
+        elif parts == ["metrics"]:
+            self._send(200, metrics.prometheus_text(), "text/plain; version=0.0.4")
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                self._send(404, {"error": "unknown job"})
+            elif len(parts) == 2:
+                self._send(200, job.to_dict())
+            elif parts[2] == "events":
+                self._stream_events(job)
+            else:
+                self._send(404, {"error": "not found"})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _stream_events(self, job):
+        """
+        Send one server-sent event per finished stage (including ones finished before
+        the client connected), then a final event with the job status.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        sent = set()
+        while True:
+            with job.changed:
+                new_stages = {name: result for name, result in job.stages.items() if name not in sent}
+                finished = job.status in ("done", "failed")
+                if not new_stages and not finished:
+                    job.changed.wait(timeout=15)
+                    continue
+            for name, result in new_stages.items():
+                sent.add(name)
+                self.wfile.write(f"event: stage\ndata: {json.dumps({'stage': name, 'result': result})}\n\n".encode("utf-8"))
+            if finished:
+                self.wfile.write(f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                return
+            self.wfile.flush()
+
+
+class ServiceClient:
+    """
+    Minimal client for the analysis service, used by app.py in thin-client mode.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def submit(self, filename, data, job_desc):
+        """
+        Submit a resume and job description; returns the job id.
+        """
+        response = self.session.post(f"{self.base_url}/jobs", json={
+            "filename": filename,
+            "file_b64": base64.b64encode(data).decode("ascii"),
+            "job_desc": job_desc
+        }, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["job_id"]
+
+    def get(self, job_id):
+        """
+        Return the job's current state, or None if the service no longer knows it.
+        """
+        response = self.session.get(f"{self.base_url}/jobs/{job_id}", timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+
+def serve(host="127.0.0.1", port=8600, workers=4):
+    """
+    Start the service and block serving requests.
+    """
+    handler = type("BoundServiceHandler", (ServiceHandler,), {"jobs": JobQueue(workers)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"Resume analysis service listening on http://{host}:{port} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless resume analysis service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=4, help="analyses processed in parallel")
+    args = parser.parse_args()
+    serve(args.host, args.port, max(1, args.workers))
+
+
+if __name__ == "__main__":
+    main()